@@ -0,0 +1,16 @@
+from warehouse.store import HUMIDITY_SENSITIVE
+
+
+def exact_state(engine, rng=True):
+    # всё состояние партии вплоть до порядка корзин склада; позиция в корзине влажности
+    # есть только у чувствительных к ней товаров, у остальных там может лежать старое значение
+    store = engine._resources
+    return (engine._day, engine._money, engine._humidity, engine._security_level,
+            [p._active for p in engine._pests], [p._owned for p in engine._poisons],
+            engine._rng.getstate() if rng else None,
+            store._names, store._types, list(store._name_codes), list(store._type_codes),
+            list(store._values), bytes(store._flags), list(store._health_positions),
+            [p if f & HUMIDITY_SENSITIVE else None for p, f in zip(store._humidity_positions, store._flags)],
+            list(store._type_counts), list(store._damaged._members), list(store._humidity._members),
+            [list(b._members) for b in store._healthy],
+            round(store._healthy_value, 6), round(store._total_value, 6))
@@ -0,0 +1,37 @@
+import shutil
+
+import pytest
+
+from warehouse.catalog import DATA_DIR, CatalogError, load_catalog
+
+
+@pytest.fixture
+def catalog_dir(tmp_path):
+    directory = tmp_path / 'data'
+    shutil.copytree(DATA_DIR, directory)
+    return directory
+
+def append_row(path, row):
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        f.write(row + '\r\n')
+
+
+def test_default_catalog_loads(catalog_dir):
+    catalog = load_catalog(str(catalog_dir))
+    assert catalog.resource_records()
+    assert catalog.create_pests()
+
+def test_csv_row_longer_than_header(catalog_dir):
+    append_row(catalog_dir / 'resources.csv', 'Лишнее,продукты,10,1,1,extra')
+    with pytest.raises(CatalogError, match='extra'):
+        load_catalog(str(catalog_dir))
+
+def test_csv_row_shorter_than_header(catalog_dir):
+    append_row(catalog_dir / 'resources.csv', 'Короткое,продукты')
+    with pytest.raises(CatalogError, match="нет поля 'value'"):
+        load_catalog(str(catalog_dir))
+
+def test_csv_bad_number(catalog_dir):
+    append_row(catalog_dir / 'resources.csv', 'Плохое,продукты,много,1,1')
+    with pytest.raises(CatalogError, match="поле 'value'"):
+        load_catalog(str(catalog_dir))
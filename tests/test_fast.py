@@ -0,0 +1,81 @@
+import random
+import statistics
+
+import pytest
+
+from warehouse.fast import AliasTable, FastWarehouseEngine, geometric, skips
+from warehouse.replay import main, record_game, save_record, verify
+
+from .conftest import exact_state
+
+
+def fast_state(engine):
+    return exact_state(engine), engine._event_day, engine._event_set, engine._spawn_clocks, engine._actions
+
+def day_by_day(seed, days, stop_on_end):
+    engine = FastWarehouseEngine(seed=seed)
+    engine.track_actions()
+    for _ in range(days):
+        result = engine.next_day()
+        if stop_on_end and (result._won or result._lost):
+            break
+    return engine
+
+
+@pytest.mark.parametrize('stop_on_end', [True, False])
+@pytest.mark.parametrize('seed', range(40))
+def test_advance_matches_next_day(seed, stop_on_end):
+    engine = FastWarehouseEngine(seed=seed)
+    engine.track_actions()
+    engine.advance(150, stop_on_end)
+    assert fast_state(engine) == fast_state(day_by_day(seed, 150, stop_on_end))
+
+@pytest.mark.parametrize('seed', range(5))
+def test_advance_in_pieces(seed):
+    engine = FastWarehouseEngine(seed=seed)
+    engine.track_actions()
+    for days in (1, 7, 3, 30, 2, 40):
+        engine.advance(days, stop_on_end=False)
+    assert fast_state(engine) == fast_state(day_by_day(seed, 83, False))
+
+def test_fast_record_replays_with_its_engine(tmp_path):
+    engine = FastWarehouseEngine(seed=11)
+    engine.track_actions()
+    engine.advance(20)
+    engine.buy_poison(engine._poisons[0])
+    engine.advance(30)
+    record = record_game(engine)
+    assert record['engine'] == 'FastWarehouseEngine'
+    assert verify(record) == {}
+    path = str(tmp_path / 'fast.json')
+    save_record(path, engine)
+    assert main([path]) == 0
+
+
+def test_geometric_mean():
+    rng = random.Random(1)
+    for chance in (0.01, 0.2, 0.9):
+        mean = statistics.fmean(geometric(rng, chance) for _ in range(20000))
+        assert mean == pytest.approx(1 / chance, rel=0.05)
+    assert geometric(rng, 1.0) == 1
+    assert geometric(rng, 0.0) == float('inf')
+
+def test_skips_hit_rate():
+    rng = random.Random(2)
+    hits = [0] * 50
+    for _ in range(4000):
+        for i in skips(rng, 50, 0.1):
+            hits[i] += 1
+    assert statistics.fmean(hits) / 4000 == pytest.approx(0.1, rel=0.05)
+    assert min(hits) > 0
+
+def test_alias_table_frequencies():
+    weights = [0.5, 0.1, 0.0, 0.3, 0.1]
+    table = AliasTable(weights)
+    rng = random.Random(3)
+    counts = [0] * len(weights)
+    for _ in range(50000):
+        counts[table.sample(rng)] += 1
+    for count, weight in zip(counts, weights):
+        assert count / 50000 == pytest.approx(weight, abs=0.01)
+    assert counts[2] == 0
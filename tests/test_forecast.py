@@ -0,0 +1,60 @@
+import copy
+import random
+
+import pytest
+
+from warehouse.engine import WarehouseEngine
+from warehouse.forecast import FORECAST_DAYS, RiskForecast
+
+GAMES = 2000
+# допуски с запасом в 3–4 стандартные ошибки выборки из GAMES партий: аренда относительно,
+# остальное в абсолютных единицах (повреждённых товаров, доли партий, рублей)
+RENT_TOLERANCE = 0.05
+DAMAGED_TOLERANCE = 0.05
+ACTIVE_TOLERANCE = 0.04
+MONEY_TOLERANCE = 12.0
+
+
+def sampled_means(engine, days, games):
+    # те же величины, что и в прогнозе, усреднённые по партиям от одного состояния
+    types = {t for _, t, *_ in engine._catalog.resource_records()}
+    means = [{'rent': 0.0, 'money': 0.0, 'damaged': dict.fromkeys(types, 0.0),
+              'active': {p._name: 0.0 for p in engine._pests}} for _ in range(days)]
+    for game in range(games):
+        copy_ = copy.deepcopy(engine)
+        copy_._rng = random.Random(f"forecast:{game}")
+        store = copy_._resources
+        for day in means:
+            before = {t: store.count_of_type(t) - store.healthy_totals().get(t, (0,))[0] for t in types}
+            result = copy_.next_day()
+            day['rent'] += result._rent / games
+            day['money'] += (copy_._money - engine._money) / games
+            totals = store.healthy_totals()
+            for t in types:
+                day['damaged'][t] += (store.count_of_type(t) - totals.get(t, (0,))[0] - before[t]) / games
+            for pest in copy_._pests:
+                day['active'][pest._name] += pest._active / games
+    return means
+
+
+def fresh():
+    return WarehouseEngine(seed=1)
+
+def infested():
+    engine = WarehouseEngine(seed=7)
+    for _ in range(8):
+        engine.next_day()
+    engine._humidity = 48
+    return engine
+
+@pytest.mark.parametrize('start', [fresh, infested])
+def test_forecast_matches_sampled_games(start):
+    engine = start()
+    forecasts = RiskForecast(engine).forecast(FORECAST_DAYS)
+    for forecast, sampled in zip(forecasts, sampled_means(engine, FORECAST_DAYS, GAMES)):
+        assert forecast._rent == pytest.approx(sampled['rent'], rel=RENT_TOLERANCE, abs=0.5)
+        assert forecast._money_change == pytest.approx(sampled['money'], abs=MONEY_TOLERANCE)
+        for resource_type, damaged in sampled['damaged'].items():
+            assert forecast._damaged.get(resource_type, 0.0) == pytest.approx(damaged, abs=DAMAGED_TOLERANCE)
+        for name, active in sampled['active'].items():
+            assert forecast._active[name] == pytest.approx(active, abs=ACTIVE_TOLERANCE)
@@ -0,0 +1,19 @@
+import pytest
+
+from warehouse.montecarlo import CombinedPolicy, IdlePolicy, PoisonPolicy, RepairPolicy, evaluate, main
+
+
+def test_outcomes_are_exclusive():
+    summary = evaluate(IdlePolicy(), games=300, seed=1, workers=1)
+    assert summary['games'] == 300
+    assert summary['win_rate'] + summary['bankruptcy_rate'] <= 1.0
+
+def test_same_seeds_give_same_summary():
+    policy = CombinedPolicy(PoisonPolicy(), RepairPolicy(200))
+    assert evaluate(policy, games=40, seed=5, workers=1) == evaluate(policy, games=40, seed=5, workers=2)
+
+def test_no_games():
+    with pytest.raises(ValueError):
+        evaluate(IdlePolicy(), games=0)
+    with pytest.raises(SystemExit):
+        main(['--games', '0'])
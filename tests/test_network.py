@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from warehouse.network import NetworkError, WarehouseNetwork, load_graph, ring_graph
+
+
+def write_graph(tmp_path, data):
+    path = tmp_path / 'graph.json'
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return str(path)
+
+
+def test_two_site_ring_has_one_edge():
+    assert ring_graph(2, 0.5) == {0: [(1, 0.5)], 1: [(0, 0.5)]}
+
+def test_ring_neighbours_are_not_repeated():
+    graph = ring_graph(4, 0.5, reach=2)
+    assert sorted(site for site, _ in graph[0]) == [1, 2, 3]
+
+@pytest.mark.parametrize('edge', [[0, 1, "0.5"], [0.0, 1, 0.5], [0, True, 0.5], [0, 1, 2], [0, 5, 0.5], "abc"])
+def test_bad_edges(tmp_path, edge):
+    with pytest.raises(NetworkError):
+        load_graph(write_graph(tmp_path, {'sites': 2, 'edges': [edge]}))
+
+def test_result_does_not_depend_on_workers():
+    graph = ring_graph(6, 0.3)
+    runs = []
+    for workers in (1, 3):
+        with WarehouseNetwork(graph, seed=7, workers=workers) as network:
+            runs.append([(d._pool, d._active_pests, d._damaged) for d in network.run(15)])
+    assert runs[0] == runs[1]
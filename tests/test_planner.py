@@ -0,0 +1,74 @@
+import json
+import shutil
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from warehouse.catalog import DATA_DIR, load_catalog
+from warehouse.engine import WarehouseEngine
+from warehouse.planner import HUMIDITY, POISON, REPAIR, SECURITY, Planner, load_planner
+
+
+@pytest.fixture(scope='module')
+def small_catalog(tmp_path_factory):
+    # два вредителя и три вещи: таблица считается за секунды, а не за полминуты
+    directory = tmp_path_factory.mktemp('catalog') / 'data'
+    shutil.copytree(DATA_DIR, directory)
+    with open(directory / 'pests.json', encoding='utf-8') as f:
+        pests = json.load(f)[:2]
+    with open(directory / 'pests.json', 'w', encoding='utf-8') as f:
+        json.dump(pests, f, ensure_ascii=False)
+    with open(directory / 'poisons.json', 'w', encoding='utf-8') as f:
+        json.dump([{"name": "Яд", "cost": 100, "effectiveness": {pests[0]['name']: 0.8, pests[1]['name']: 0.6}}],
+                  f, ensure_ascii=False)
+    with open(directory / 'events.json', encoding='utf-8') as f:
+        events = json.load(f)
+    for event in events:
+        event.pop('pest', None)
+    with open(directory / 'events.json', 'w', encoding='utf-8') as f:
+        json.dump(events, f, ensure_ascii=False)
+    lines = (directory / 'resources.csv').read_text(encoding='utf-8').splitlines()
+    (directory / 'resources.csv').write_text('\n'.join(lines[:4]) + '\n', encoding='utf-8')
+    return load_catalog(str(directory))
+
+@pytest.fixture(scope='module')
+def cache(tmp_path_factory):
+    return str(tmp_path_factory.mktemp('cache'))
+
+@pytest.fixture(scope='module')
+def planner(small_catalog, cache):
+    return load_planner(small_catalog, cache)
+
+
+def follow(planner, engine):
+    for _ in range(100):
+        action, _ = planner.recommend(engine)
+        if action == REPAIR:
+            engine.repair_resources(engine.affordable_repairs())
+        elif action == HUMIDITY:
+            engine.reduce_humidity()
+        elif action == SECURITY:
+            engine.upgrade_security()
+        elif action.startswith(POISON):
+            poison = engine.get_poison(action[len(POISON):])
+            if engine.buy_poison(poison):
+                engine.use_poison(poison)
+        result = engine.next_day()
+        if result._won or result._lost:
+            return result._won and not result._lost
+    return False
+
+def test_win_chance_matches_following_the_policy(planner, small_catalog):
+    # подсказка обещает шанс победы без дисконта — он должен сходиться с партиями по этой политике
+    games = 600
+    _, promised = planner.recommend(WarehouseEngine(catalog=small_catalog, seed=0))
+    won = sum(follow(planner, WarehouseEngine(catalog=small_catalog, seed=f"plan:{i}")) for i in range(games))
+    assert 0.0 <= promised <= 1.0
+    assert won / games == pytest.approx(promised, abs=0.05)
+
+def test_table_is_cached(planner, small_catalog, cache):
+    cached = Planner(small_catalog)
+    cached.load(cached.cache_path(cache))
+    engine = WarehouseEngine(catalog=small_catalog, seed=1)
+    assert cached.recommend(engine) == planner.recommend(engine)
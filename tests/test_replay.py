@@ -0,0 +1,86 @@
+import json
+import random
+
+import pytest
+
+from warehouse.engine import WarehouseEngine
+from warehouse.replay import ReplayError, check_record, load_record, main, record_game, replay, save_record, verify
+
+
+def play(seed, days=60, rng_seed=0):
+    # случайные действия игрока поверх дней, как в живой партии
+    engine = WarehouseEngine(seed=seed)
+    engine.track_actions()
+    rng = random.Random(rng_seed)
+    for _ in range(days):
+        choice = rng.random()
+        if choice < 0.1:
+            engine.buy_poison(engine._poisons[rng.randrange(len(engine._poisons))])
+        elif choice < 0.2 and engine.owned_poisons():
+            engine.use_poison(engine.owned_poisons()[0])
+        elif choice < 0.25:
+            engine.repair_resources(rng.choice([None, 1, 3]))
+        elif choice < 0.28:
+            engine.reduce_humidity()
+        elif choice < 0.3:
+            engine.upgrade_security()
+        result = engine.next_day()
+        if result._won or result._lost:
+            break
+    return engine
+
+
+@pytest.mark.parametrize('seed', [0, 1, 'строка', 12345])
+def test_replay_reaches_recorded_state(seed):
+    assert verify(record_game(play(seed))) == {}
+
+def test_record_without_engine_uses_base_engine():
+    record = record_game(play(5))
+    assert record.pop('engine') == 'WarehouseEngine'
+    assert verify(record) == {}
+    record['engine'] = 'Другой'
+    with pytest.raises(ReplayError):
+        check_record(record, 'запись')
+
+def test_changed_action_is_reported():
+    record = record_game(play(3))
+    record['actions'].insert(0, ['security', None])
+    assert verify(record)
+
+def test_record_file_round_trip(tmp_path):
+    engine = play(9)
+    path = str(tmp_path / 'game.json')
+    save_record(path, engine)
+    assert verify(load_record(path)) == {}
+    assert main([path]) == 0
+
+def test_unrecordable_games():
+    with pytest.raises(ReplayError):
+        record_game(WarehouseEngine(random.Random(1)))
+    with pytest.raises(ReplayError):
+        record_game(WarehouseEngine(seed=1))
+
+@pytest.mark.parametrize('text', ['nope', '[1]', '{"format": 1}', '{"format": 2}',
+                                  '{"format": 1, "seed": 1, "catalog": "x", "final": {}, "actions": [["next_day", "x"]]}',
+                                  '{"format": 1, "seed": 1, "catalog": "x", "final": {}, "actions": [["fly", 1]]}'])
+def test_malformed_records(tmp_path, text):
+    path = tmp_path / 'bad.json'
+    path.write_text(text, encoding='utf-8')
+    with pytest.raises(ReplayError):
+        load_record(str(path))
+    assert main([str(path)]) == 1
+
+def test_unknown_poison():
+    record = check_record(record_game(play(2, days=1)), 'запись')
+    record['actions'].append(['buy', 'Нет такого'])
+    with pytest.raises(ReplayError):
+        replay(record)
+
+def test_other_catalog(tmp_path):
+    record = record_game(play(4, days=5))
+    record['catalog'] = '0' * 64
+    with pytest.raises(ReplayError):
+        replay(record)
+    path = tmp_path / 'game.json'
+    path.write_text(json.dumps(record), encoding='utf-8')
+    assert main([str(path)]) == 1
@@ -0,0 +1,136 @@
+import random
+
+import pytest
+
+from warehouse.engine import WarehouseEngine
+from warehouse.objects import Resource
+from warehouse.savefile import JOURNAL_SUFFIX, SaveError, SaveFile
+
+from .conftest import exact_state
+
+
+def steal(engine, count):
+    # охрана на минимуме, чтобы кражи случались; деньги не важны
+    engine._security_level = 1
+    return engine.steal_resources(count)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'game.sav')
+
+@pytest.fixture
+def engine():
+    engine = WarehouseEngine(random.Random(3))
+    for i in range(300):
+        engine.add_resource(Resource(f"x{i % 20}", ("Еда", "Ткань", "Дерево")[i % 3], 10 + i % 7, i % 2 == 0, i % 3 == 0))
+    return engine
+
+
+def test_snapshot_round_trip(engine, path):
+    SaveFile(path).save(engine)
+    assert exact_state(SaveFile(path).load()) == exact_state(engine)
+
+def test_journal_round_trip(engine, path):
+    save = SaveFile(path)
+    save.save(engine)
+    stolen = 0
+    for day in range(30):
+        save.append(engine, engine.next_day())
+        if day % 3 == 0:
+            stolen += len(steal(engine, 5))
+            engine.repair_resources(2)
+            engine.add_resource(Resource(f"новый {day}", f"Тип {day}", 5, True))
+            engine.buy_poison(engine._poisons[0])
+            save.append(engine)
+    assert stolen
+    loaded = SaveFile(path).load()
+    assert exact_state(loaded) == exact_state(engine)
+    assert loaded._resources.healthy_totals() == engine._resources.healthy_totals()
+
+def test_appending_after_load(engine, path):
+    SaveFile(path).save(engine)
+    save = SaveFile(path)
+    loaded = save.load()
+    for _ in range(5):
+        save.append(loaded, loaded.next_day())
+    steal(loaded, 3)
+    save.append(loaded)
+    assert exact_state(SaveFile(path).load()) == exact_state(loaded)
+
+@pytest.mark.parametrize('tail', [b'\x05', b'\x05\x00\x00\x00\x00\x00\x00', b'\x40\x00\x00\x00' + b'\x00' * 12])
+def test_torn_journal_is_truncated(engine, path, tail):
+    save = SaveFile(path)
+    save.save(engine)
+    for _ in range(5):
+        save.append(engine, engine.next_day())
+    journal = path + JOURNAL_SUFFIX
+    with open(journal, 'rb') as f:
+        whole = f.read()
+    with open(journal, 'ab') as f:
+        f.write(tail)
+
+    save = SaveFile(path)
+    loaded = save.load()
+    assert exact_state(loaded) == exact_state(engine)
+    with open(journal, 'rb') as f:
+        assert f.read() == whole
+    # новые записи идут сразу за целыми
+    save.append(loaded, loaded.next_day())
+    assert exact_state(SaveFile(path).load()) == exact_state(loaded)
+
+def test_journal_from_other_snapshot_is_ignored(engine, path):
+    save = SaveFile(path)
+    save.save(engine)
+    save.append(engine, engine.next_day())
+    with open(path + JOURNAL_SUFFIX, 'rb') as f:
+        journal = f.read()
+    save.save(engine)
+    saved = exact_state(engine)
+    engine.next_day()
+    with open(path + JOURNAL_SUFFIX, 'wb') as f:
+        f.write(journal)
+    assert exact_state(SaveFile(path).load()) == saved
+
+@pytest.mark.parametrize('data', [b'', b'WHSAVE', b'not a save file at all' * 4])
+def test_bad_files(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    with pytest.raises(SaveError):
+        SaveFile(path).load()
+
+def test_loaded_game_continues_the_random_stream(engine, path):
+    save = SaveFile(path)
+    save.save(engine)
+    for _ in range(6):
+        save.append(engine, engine.next_day())
+    loaded = SaveFile(path).load()
+    for _ in range(10):
+        engine.next_day()
+        loaded.next_day()
+    assert exact_state(loaded) == exact_state(engine)
+
+def test_corrupted_snapshot_raises_save_error(engine, path):
+    save = SaveFile(path)
+    save.save(engine)
+    save.append(engine, engine.next_day())
+    with open(path, 'rb') as f:
+        good = f.read()
+    rng = random.Random(0)
+    for _ in range(200):
+        data = bytearray(good)
+        for _ in range(rng.randint(1, 4)):
+            data[rng.randrange(len(data))] ^= 1 << rng.randrange(8)
+        if rng.random() < 0.1:
+            data = data[:rng.randrange(len(data))]
+        with open(path, 'wb') as f:
+            f.write(data)
+        with pytest.raises(SaveError):
+            SaveFile(path).load()
+
+def test_inconsistent_snapshot_is_rejected(engine, path):
+    # целая контрольная сумма, но колонки разной длины
+    engine._resources._flags.append(0)
+    SaveFile(path).save(engine)
+    with pytest.raises(SaveError):
+        SaveFile(path).load()
@@ -0,0 +1,104 @@
+import random
+import statistics
+
+import pytest
+
+from warehouse.montecarlo import CombinedPolicy, PoisonPolicy, RepairPolicy, evaluate
+from warehouse.stock import StockWarehouseEngine, binomial, hypergeometric, make_engine, multivariate_hypergeometric
+
+SAMPLES = 20000
+
+
+class PlainRandom:
+    # только random(): так проверяются свои методы, а не Random.binomialvariate из Python 3.12+
+    def __init__(self, seed):
+        self.random = random.Random(seed).random
+
+
+def check_moments(values, mean, variance):
+    # среднее в пределах 4 стандартных ошибок, дисперсия — в пределах 10%
+    assert statistics.fmean(values) == pytest.approx(mean, abs=4 * (variance / len(values)) ** 0.5 + 1e-9)
+    assert statistics.pvariance(values) == pytest.approx(variance, rel=0.1, abs=1e-9)
+
+
+@pytest.mark.parametrize('n, p', [(20, 0.1), (50, 0.15), (1000, 0.3), (10 ** 6, 0.02), (1000, 0.9), (7, 1.0), (0, 0.5)])
+def test_binomial_moments(n, p):
+    rng = PlainRandom(n)
+    values = [binomial(rng, n, p) for _ in range(SAMPLES)]
+    assert all(0 <= v <= n for v in values)
+    check_moments(values, n * p, n * p * (1 - p))
+
+@pytest.mark.parametrize('draws, good, bad', [(10, 30, 70), (500, 2000, 3000), (3, 1, 100), (50, 50, 0), (90, 60, 40)])
+def test_hypergeometric_moments(draws, good, bad):
+    rng = PlainRandom(draws)
+    total = good + bad
+    values = [hypergeometric(rng, draws, good, bad) for _ in range(SAMPLES)]
+    assert all(max(0, draws - bad) <= v <= min(draws, good) for v in values)
+    variance = draws * good / total * bad / total * (total - draws) / (total - 1)
+    check_moments(values, draws * good / total, variance)
+
+def test_multivariate_hypergeometric():
+    rng = PlainRandom(1)
+    counts = [5, 0, 120, 40, 1]
+    totals = [0] * len(counts)
+    for _ in range(5000):
+        taken = multivariate_hypergeometric(rng, counts, 30)
+        assert sum(taken) == 30
+        assert all(0 <= k <= c for k, c in zip(taken, counts))
+        totals = [t + k for t, k in zip(totals, taken)]
+    for total, count in zip(totals, counts):
+        assert total / 5000 == pytest.approx(30 * count / sum(counts), abs=0.3)
+
+
+def test_quantity_is_keyword_only():
+    with pytest.raises(TypeError):
+        StockWarehouseEngine(None, None, None, 1, 5)
+    engine = StockWarehouseEngine(seed=1, quantity=5)
+    assert engine._resources.healthy_count() == 5 * len(engine._resources)
+    assert type(make_engine(seed=1)).__name__ == 'WarehouseEngine'
+
+def test_day_loop_keeps_ledger_consistent():
+    engine = make_engine(10 ** 6, seed=3)
+    ledger = engine._resources
+    units = ledger.healthy_count()
+    stolen = 0
+    rng = random.Random(3)
+    for _ in range(120):
+        if rng.random() < 0.1:
+            engine.repair_resources(rng.choice([None, 1000]))
+        if engine.active_pests() and rng.random() < 0.2:
+            poison = engine._poisons[-1]
+            if engine.buy_poison(poison):
+                engine.use_poison(poison)
+        result = engine.next_day()
+        stolen += sum(count for _, count in result._stolen)
+        assert ledger.healthy_count() + ledger.damaged_count() + stolen == units
+        assert ledger.healthy_count() == sum(line._healthy for line in ledger)
+        assert ledger.damaged_count() == sum(line._damaged_count for line in ledger)
+        assert ledger.healthy_value() == pytest.approx(sum(line._healthy * line._value for line in ledger))
+        assert all(line._healthy >= 0 and line._damaged_count >= 0 for line in ledger)
+        assert engine.calculate_rent() == pytest.approx(ledger.healthy_value() * 0.1)
+
+def test_same_seed_same_game():
+    def play(seed):
+        engine = make_engine(1000, seed=seed)
+        for _ in range(60):
+            engine.next_day()
+        return engine._money, [(line._healthy, line._damaged_count) for line in engine._resources]
+    assert play(7) == play(7)
+
+def test_simulate_with_quantity():
+    policy = CombinedPolicy(PoisonPolicy(), RepairPolicy(200))
+    summary = evaluate(policy, games=20, seed=1, workers=1, quantity=1000)
+    assert summary['games'] == 20
+    assert summary['win_rate'] + summary['bankruptcy_rate'] <= 1.0
+
+def test_planner_sees_damaged_units():
+    pytest.importorskip('numpy')
+    from warehouse.planner import Planner
+    planner = Planner()
+    engine = make_engine(1000, seed=1)
+    for line in engine._resources:
+        engine._resources.damage(line, line._healthy // 2)
+    d = planner._state(engine)[-1]
+    assert d == round(planner._items / 2)
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from warehouse.engine import WarehouseEngine
+from warehouse.objects import Resource
+from warehouse.timeline import Timeline
+
+from .conftest import exact_state
+
+
+def totals_of(engine):
+    return {t: tuple(round(x, 6) for x in v) for t, v in engine._resources.healthy_totals().items()}
+
+def act(engine, rng):
+    choice = rng.random()
+    if choice < 0.4:
+        engine.next_day()
+    elif choice < 0.55:
+        engine._security_level = 1
+        engine.steal_resources(rng.randint(1, 4))
+    elif choice < 0.7:
+        engine.add_resource(Resource(f"новый {rng.randrange(5)}", f"Тип {rng.randrange(3)}", rng.randint(1, 9),
+                                     rng.random() < 0.5))
+    elif choice < 0.8:
+        engine.buy_poison(engine._poisons[rng.randrange(len(engine._poisons))])
+    elif choice < 0.9 and engine.owned_poisons():
+        engine.use_poison(engine.owned_poisons()[0])
+    else:
+        engine.repair_resources(rng.choice([None, 1, 2]))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_checkout_restores_exact_state(seed):
+    rng = random.Random(seed)
+    engine = WarehouseEngine(seed=seed)
+    timeline = Timeline(engine)
+    totals = {0: totals_of(engine)}
+    states = {0: exact_state(engine)}
+    for step in range(200):
+        if rng.random() < 0.2 and len(timeline) > 1:
+            node = timeline[rng.randrange(len(timeline))]
+            timeline.checkout(node)
+        else:
+            act(engine, rng)
+            node = timeline.commit(f"шаг {step}")
+            states[node._index] = exact_state(engine)
+            totals[node._index] = totals_of(engine)
+        assert exact_state(engine) == states[node._index]
+        assert totals_of(engine) == totals[node._index]
+
+def test_undo_walks_back_to_start():
+    engine = WarehouseEngine(seed=1)
+    timeline = Timeline(engine)
+    start = exact_state(engine)
+    rng = random.Random(1)
+    for step in range(30):
+        act(engine, rng)
+        timeline.commit(f"шаг {step}")
+    while timeline.undo() is not None:
+        pass
+    assert exact_state(engine) == start
+
+def test_checkout_commits_pending_changes():
+    engine = WarehouseEngine(seed=2)
+    timeline = Timeline(engine)
+    engine.next_day()
+    changed = exact_state(engine)
+    timeline.checkout(timeline[0])
+    assert len(timeline) == 2
+    timeline.checkout(timeline[1])
+    assert exact_state(engine) == changed
@@ -0,0 +1,4 @@
+from .engine import (
+    GameObject, Resource, Pest, Poison, RandomEvent, DayResult, WarehouseEngine,
+)
+from .store import ResourceStore, ResourceView
@@ -0,0 +1,32 @@
+import argparse
+import importlib
+import sys
+
+# модули подгружаются только для выбранной команды: без gui tkinter не импортируется вовсе
+COMMANDS = {
+    'gui': ('warehouse.gui', "окно игры (нужны tkinter и дисплей)"),
+    'simulate': ('warehouse.montecarlo', "много партий без интерфейса, сводка по стратегиям"),
+    'bench': ('warehouse.bench', "замеры горячих участков симуляции"),
+    'replay': ('warehouse.replay', "повтор записанных партий и сверка"),
+    'plan': ('warehouse.planner', "расчёт таблицы рекомендаций"),
+    'network': ('warehouse.network', "сеть складов на нескольких процессах"),
+    'telemetry': ('warehouse.telemetry', "поток показателей по дням в CSV/JSONL"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m warehouse',
+        description="Борьба с вредителями на складе",
+        epilog="\n".join(f"  {name:<10} {help}" for name, (_, help) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=sorted(COMMANDS), metavar='команда')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="параметры команды (см. команда --help)")
+    args = parser.parse_args(argv)
+
+    module = importlib.import_module(COMMANDS[args.command][0])
+    return module.main(args.args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
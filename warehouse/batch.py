@@ -0,0 +1,178 @@
+import numpy as np
+
+from .engine import (
+    WarehouseEngine, START_MONEY, START_HUMIDITY, START_SECURITY,
+    MIN_HUMIDITY, MAX_HUMIDITY, HUMIDITY_DRIFT, SPAWN_CHANCE, WIN_DAY, THEFT_SUCCESS, THEFT_FINE,
+    FIRE_DAMAGE_CHANCE, FIRE_KILL_CHANCE, FLOOD_HUMIDITY, FLOOD_DAMAGE_CHANCE, FLOOD_MOULD_CHANCE,
+)
+
+
+class BatchSimulator:
+    # N независимых складов в виде массивов: строка = склад, столбец = ресурс/вредитель
+    def __init__(self, count, seed=None, money=START_MONEY, humidity=START_HUMIDITY,
+                 security_level=START_SECURITY, stop_on_win=True, catalog=None):
+        template = WarehouseEngine(catalog=catalog)
+        resources = template._resources
+        pests = template._pests
+
+        self._count = count
+        self._rng = np.random.default_rng(seed)
+        self._stop_on_win = stop_on_win
+        self._day = 0
+
+        self._resource_names = [r._name for r in resources]
+        self._pest_names = [p._name for p in pests]
+        types = sorted({r._type for r in resources})
+        self._type_names = types
+        self._values = np.array([r._value for r in resources], dtype=float)
+        self._type_codes = np.array([types.index(r._type) for r in resources])
+        self._humidity_sensitive = np.array([r._humidity_sensitive for r in resources])
+
+        self._damage_chance = np.array([p._damage_chance for p in pests])
+        self._affects = np.array([[r._type in p._affected_types for r in resources] for p in pests])
+        self._requires = np.array([[r._type in p._spawn_conditions.get('required_resources', ())
+                                    for r in resources] for p in pests])
+        self._has_requirement = np.array(['required_resources' in p._spawn_conditions for p in pests])
+        self._min_damaged = np.array([p._spawn_conditions.get('damaged_resources', 0) for p in pests])
+        self._min_day = np.array([p._spawn_conditions.get('min_day', 0) for p in pests])
+        self._min_humidity = np.array([p._spawn_conditions.get('humidity', -np.inf) for p in pests], dtype=float)
+        # log(1 - шанс) по вредителю и ресурсу: вероятность уцелеть за день = exp(active @ log_survive)
+        self._log_survive = np.where(self._affects, np.log1p(-self._damage_chance)[:, None], 0.0)
+
+        self._events = template._random_events
+        self._event_names = [e._name for e in self._events]
+        self._event_probabilities = np.array([e._probability for e in self._events])
+        self._event_effects = {
+            'steal': self._theft,
+            'fire': self._fire,
+            'flood': self._flood,
+            'income': self._income,
+            'fine': self._fine,
+        }
+        self._event_counts = np.zeros((count, len(self._event_names)), dtype=np.int64)
+
+        shape = (count, len(resources))
+        self._present = np.ones(shape, dtype=bool)
+        self._damaged = np.zeros(shape, dtype=bool)
+        self._active = np.zeros((count, len(pests)), dtype=bool)
+        self._money = np.broadcast_to(np.asarray(money, dtype=float), (count,)).copy()
+        self._humidity = np.broadcast_to(np.asarray(humidity, dtype=np.int64), (count,)).copy()
+        self._security_level = np.broadcast_to(np.asarray(security_level, dtype=np.int64), (count,)).copy()
+        self._alive = np.ones(count, dtype=bool)
+        self._bankrupt_day = np.full(count, -1, dtype=np.int64)
+        self._won_day = np.full(count, -1, dtype=np.int64)
+
+    def step(self):
+        live = self._alive
+        rng = self._rng
+        self._day += 1
+
+        drift = rng.integers(-HUMIDITY_DRIFT, HUMIDITY_DRIFT + 1, self._count)
+        self._humidity = np.where(live, np.clip(self._humidity + drift, MIN_HUMIDITY, MAX_HUMIDITY), self._humidity)
+
+        self.spawn_pests()
+        self.damage_resources()
+
+        fired = rng.random((self._count, len(self._event_names))) < self._event_probabilities
+        fired &= live[:, None]
+        self._event_counts += fired
+        for i, event in enumerate(self._events):
+            rows = fired[:, i]
+            if rows.any():
+                self._event_effects[event._kind](rows, event._params)
+
+        rent = self.calculate_rent()
+        self._money += np.where(live, rent, 0.0)
+
+        lost = live & (self._money < 0)
+        self._bankrupt_day[lost] = self._day
+        finished = lost
+        if self._stop_on_win and self._day > WIN_DAY:
+            won = live & ~lost & ~self._active.any(axis=1)
+            self._won_day[won] = self._day
+            finished = finished | won
+        self._alive = live & ~finished
+        return rent
+
+    def run(self, days):
+        for _ in range(days):
+            if not self._alive.any():
+                break
+            self.step()
+        return self.summary()
+
+    def spawn_pests(self):
+        live = self._alive
+        eligible = ~self._active & live[:, None]
+
+        has_required = (self._present.astype(np.int64) @ self._requires.T.astype(np.int64)) > 0
+        eligible &= has_required | ~self._has_requirement
+        eligible &= self.damaged_count()[:, None] >= self._min_damaged
+        eligible &= self._day >= self._min_day
+        eligible &= self._humidity[:, None] >= self._min_humidity
+
+        spawn_chance = np.where(self._security_level > 1, SPAWN_CHANCE / self._security_level, SPAWN_CHANCE)
+        rolls = self._rng.random(self._active.shape) < spawn_chance[:, None]
+        self._active |= eligible & rolls
+
+    def damage_resources(self):
+        # один бросок на ресурс вместо броска на каждую пару вредитель×ресурс
+        log_survive = self._active.astype(float) @ self._log_survive
+        at_risk = self._present & ~self._damaged & (log_survive < 0) & self._alive[:, None]
+        hit = at_risk & (self._rng.random(self._damaged.shape) >= np.exp(log_survive))
+        self._damaged |= hit
+        return hit
+
+    def calculate_rent(self):
+        return ((self._present & ~self._damaged) @ self._values) * 0.1
+
+    def damaged_count(self):
+        return (self._present & self._damaged).sum(axis=1)
+
+    def _theft(self, rows, params):
+        rng = self._rng
+        stealable = self._present & ~self._damaged & rows[:, None]
+        wanted = rng.integers(params['min'], params['max'] + 1, self._count)
+
+        keys = np.where(stealable, rng.random(stealable.shape), np.inf)
+        rank = keys.argsort(axis=1).argsort(axis=1)
+        chosen = stealable & (rank < wanted[:, None])
+
+        success = rng.random(self._count) <= THEFT_SUCCESS / self._security_level
+        chosen &= success[:, None]
+        self._money -= (chosen @ self._values) * THEFT_FINE
+        self._present &= ~chosen
+
+    def _fire(self, rows, params):
+        rng = self._rng
+        self._damaged |= self._present & rows[:, None] & (rng.random(self._damaged.shape) < FIRE_DAMAGE_CHANCE)
+        self._active &= ~(rows[:, None] & (rng.random(self._active.shape) < FIRE_KILL_CHANCE))
+
+    def _flood(self, rows, params):
+        rng = self._rng
+        flooded = np.array([name == params.get('pest') for name in self._pest_names])
+        self._humidity = np.where(rows, np.minimum(100, self._humidity + FLOOD_HUMIDITY), self._humidity)
+        self._damaged |= (self._present & self._humidity_sensitive & rows[:, None]
+                          & (rng.random(self._damaged.shape) < FLOOD_DAMAGE_CHANCE))
+        self._active |= rows[:, None] & flooded & (rng.random(self._active.shape) < FLOOD_MOULD_CHANCE)
+
+    def _income(self, rows, params):
+        self._money += np.where(rows, self._rng.integers(params['min'], params['max'] + 1, self._count), 0)
+
+    def _fine(self, rows, params):
+        self._money -= np.where(rows, self._rng.integers(params['min'], params['max'] + 1, self._count), 0)
+
+    def summary(self):
+        bankrupt = self._bankrupt_day >= 0
+        won = self._won_day >= 0
+        return {
+            'day': self._day,
+            'warehouses': self._count,
+            'bankruptcy_rate': float(bankrupt.mean()),
+            'win_rate': float(won.mean()),
+            'mean_days_to_bankruptcy': float(self._bankrupt_day[bankrupt].mean()) if bankrupt.any() else None,
+            'mean_money': float(self._money.mean()),
+            'damaged_fraction': float(self.damaged_count().sum() / max(1, self._present.sum())),
+            'stolen_fraction': float(1 - self._present.mean()),
+            'events': dict(zip(self._event_names, self._event_counts.sum(axis=0).tolist())),
+        }
@@ -0,0 +1,213 @@
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from time import perf_counter
+
+from .engine import WarehouseEngine
+from .objects import Pest
+
+SIZES = (10, 1_000, 100_000, 1_000_000)
+PESTS = 32
+SEED = 12345
+OPS_PER_CASE = 100_000
+TOLERANCE = 0.8
+REPEATS = 5
+RICH = 10 ** 12
+
+
+def build_engine(size, pests=PESTS, seed=SEED):
+    engine = WarehouseEngine(seed=seed)
+    catalog = list(engine._resources)
+    store = engine.create_store()
+    for i in range(size):
+        r = catalog[i % len(catalog)]
+        store.add(r._name, r._type, r._value, r._humidity_sensitive, r._food)
+    engine._resources = store
+
+    templates = list(engine._pests)
+    for i in range(len(templates), pests):
+        p = templates[i % len(templates)]
+        engine._pests.append(Pest(f"{p._name} #{i}", p._damage_chance,
+                                  dict(p._spawn_conditions), list(p._affected_types)))
+    for p in engine._pests:
+        p._active = True
+    engine._security_level = 1
+    engine._money = RICH
+    return engine
+
+def repair_all(engine):
+    store = engine._resources
+    for slot in store.damaged_slots():
+        store.set_damaged(slot, False)
+    engine._money = RICH
+
+def restore_stolen(engine):
+    # кража уменьшает склад: без возврата маленький склад пустеет и замеряется ранний выход
+    store = engine._resources
+    store.track_undo()
+    store.rollback(store.pop_undo())
+    engine._money = RICH
+
+def damage_all(engine):
+    store = engine._resources
+    for slot in range(len(store)):
+        store.set_damaged(slot, True)
+    engine._money = RICH
+
+
+def case_next_day(engine):
+    engine.next_day()
+    return 1
+
+def case_check_spawn(engine):
+    for pest in engine._pests:
+        pest.check_spawn_conditions(engine)
+    return len(engine._pests)
+
+def case_try_damage(engine):
+    pest = engine._pests[0]
+    rng = engine._rng
+    store = engine._resources
+    views = store.views(range(min(len(store), 10_000)))
+    for resource in views:
+        pest.try_damage(resource, rng)
+    return len(views)
+
+def case_steal(engine):
+    engine.steal_resources(3)
+    return 1
+
+def case_fire(engine):
+    engine.fire_damage()
+    return 1
+
+def case_flood(engine):
+    engine.flood_damage()
+    return 1
+
+def case_repair(engine):
+    engine.repair_resources()
+    return 1
+
+# (имя, замер, подготовка перед каждым вызовом — не входит во время)
+CASES = (
+    ('next_day', case_next_day, repair_all),
+    ('check_spawn_conditions', case_check_spawn, None),
+    ('try_damage', case_try_damage, repair_all),
+    ('steal_resources', case_steal, restore_stolen),
+    ('fire_damage', case_fire, repair_all),
+    ('flood_damage', case_flood, repair_all),
+    ('repair_resources', case_repair, damage_all),
+)
+
+
+def iterations_for(size):
+    return max(1, min(1000, OPS_PER_CASE // max(1, size)))
+
+def timed_pass(engine, op, setup, iterations):
+    ops = 0
+    elapsed = 0.0
+    for _ in range(iterations):
+        if setup is not None:
+            setup(engine)
+        started = perf_counter()
+        ops += op(engine)
+        elapsed += perf_counter() - started
+    return ops, elapsed
+
+def run_case(size, name, op, setup, seed=SEED, repeats=REPEATS):
+    # прогрев и лучший из repeats проходов: один проход слишком шумный для сравнения с базой
+    engine = build_engine(size, seed=seed)
+    iterations = iterations_for(size)
+    timed_pass(engine, op, setup, 1)
+    passes = [timed_pass(engine, op, setup, iterations) for _ in range(repeats)]
+    ops, elapsed = max(passes, key=lambda p: p[0] / p[1] if p[1] else float('inf'))
+    return {
+        'case': name,
+        'size': size,
+        'ops': ops,
+        'seconds': elapsed,
+        'ops_per_sec': ops / elapsed if elapsed else float('inf'),
+    }
+
+def measure_memory(size, seed=SEED):
+    tracemalloc.start()
+    try:
+        engine = build_engine(size, seed=seed)
+        engine.next_day()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+def run(sizes=SIZES, cases=None, seed=SEED, log=None, repeats=REPEATS):
+    selected = [c for c in CASES if cases is None or c[0] in cases]
+    results = []
+    memory = {}
+    for size in sizes:
+        for name, op, setup in selected:
+            result = run_case(size, name, op, setup, seed, repeats)
+            results.append(result)
+            if log:
+                log(f"{name:<24}{size:>10}{result['ops_per_sec']:>16.1f} оп/с")
+        memory[str(size)] = measure_memory(size, seed)
+        if log:
+            log(f"{'peak memory':<24}{size:>10}{memory[str(size)] / 1e6:>16.1f} МБ")
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'sizes': list(sizes),
+            'pests': PESTS,
+            'repeats': repeats,
+        },
+        'results': results,
+        'peak_memory_bytes': memory,
+    }
+
+def compare(current, baseline, tolerance=TOLERANCE):
+    old = {(r['case'], r['size']): r['ops_per_sec'] for r in baseline['results']}
+    rows = []
+    for r in current['results']:
+        before = old.get((r['case'], r['size']))
+        if not before:
+            continue
+        ratio = r['ops_per_sec'] / before
+        rows.append((r['case'], r['size'], before, r['ops_per_sec'], ratio, ratio < tolerance))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк горячих путей симуляции склада")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES))
+    parser.add_argument('--cases', nargs='+', choices=[c[0] for c in CASES])
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--repeats', type=int, default=REPEATS, help="проходов на случай, берётся лучший")
+    parser.add_argument('--output', help="куда сохранить результаты (JSON)")
+    parser.add_argument('--baseline', help="JSON прошлого прогона для сравнения")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="доля от базовой скорости, ниже которой считаем регрессией")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.cases, args.seed, log=print, repeats=args.repeats)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = 0
+        for case, size, before, after, ratio, slower in compare(report, baseline, args.tolerance):
+            mark = "  РЕГРЕССИЯ" if slower else ""
+            print(f"{case:<24}{size:>10}{before:>14.1f} → {after:<14.1f}{ratio:>7.2f}x{mark}")
+            regressions += slower
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
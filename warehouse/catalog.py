@@ -0,0 +1,257 @@
+import csv
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+from .objects import Pest, Poison, RandomEvent, compile_spawn_predicate
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+CATALOG_NAMES = ('resources', 'pests', 'poisons', 'events')
+EFFECTS = ('steal', 'fire', 'flood', 'income', 'fine')
+SPAWN_CONDITIONS = ('required_resources', 'damaged_resources', 'min_day', 'humidity')
+TRUE_WORDS = ('1', 'true', 'yes', 'да')
+FALSE_WORDS = ('0', 'false', 'no', 'нет')
+
+
+class CatalogError(ValueError):
+    pass
+
+
+class Field:
+    def __init__(self, kind, required=True, low=None, high=None, default=None):
+        self._kind = kind
+        self._required = required
+        self._low = low
+        self._high = high
+        self._default = default
+
+    def parse(self, value, from_csv):
+        kind = self._kind
+        if from_csv:
+            value = value.strip()
+            if kind == 'bool':
+                if value.lower() in TRUE_WORDS:
+                    return True
+                if value.lower() in FALSE_WORDS:
+                    return False
+                raise ValueError("ожидалось 1/0 или true/false")
+            if kind == 'list':
+                return [item.strip() for item in value.split(';') if item.strip()]
+            if kind == 'mapping':
+                pairs = {}
+                for item in value.split(';'):
+                    if item.strip():
+                        key, _, number = item.partition(':')
+                        pairs[key.strip()] = self._number(float(number))
+                return pairs
+            if kind in ('number', 'int'):
+                value = float(value)
+
+        if kind == 'str':
+            if not isinstance(value, str) or not value:
+                raise ValueError("ожидалась непустая строка")
+            return value
+        if kind == 'bool':
+            if not isinstance(value, bool):
+                raise ValueError("ожидалось true/false")
+            return value
+        if kind == 'list':
+            if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                raise ValueError("ожидался список строк")
+            return value
+        if kind == 'mapping':
+            if not isinstance(value, dict):
+                raise ValueError("ожидался объект {имя: число}")
+            return {str(k): self._number(v) for k, v in value.items()}
+        if kind == 'int':
+            number = self._number(value)
+            if number != int(number):
+                raise ValueError("ожидалось целое число")
+            return int(number)
+        return self._number(value)
+
+    def _number(self, value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError("ожидалось число")
+        if self._low is not None and value < self._low:
+            raise ValueError(f"значение меньше {self._low}")
+        if self._high is not None and value > self._high:
+            raise ValueError(f"значение больше {self._high}")
+        return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+PROBABILITY = dict(low=0.0, high=1.0)
+
+SCHEMAS = {
+    'resources': {
+        'name': Field('str'),
+        'type': Field('str'),
+        'value': Field('number', low=0),
+        'humidity_sensitive': Field('bool', required=False, default=False),
+        'food': Field('bool', required=False, default=False),
+    },
+    'pests': {
+        'name': Field('str'),
+        'damage_chance': Field('number', **PROBABILITY),
+        'affected_types': Field('list'),
+        'required_resources': Field('list', required=False),
+        'damaged_resources': Field('int', required=False, low=0),
+        'min_day': Field('int', required=False, low=0),
+        'humidity': Field('number', required=False, low=0, high=100),
+    },
+    'poisons': {
+        'name': Field('str'),
+        'cost': Field('number', low=0),
+        'effectiveness': Field('mapping', **PROBABILITY),
+    },
+    'events': {
+        'name': Field('str'),
+        'description': Field('str'),
+        'probability': Field('number', **PROBABILITY),
+        'effect': Field('str'),
+        'min': Field('int', required=False, low=0),
+        'max': Field('int', required=False, low=0),
+        'pest': Field('str', required=False),
+    },
+}
+
+
+def validate_record(raw, schema, where, from_csv=False):
+    if not isinstance(raw, dict):
+        raise CatalogError(f"{where}: ожидался объект")
+    if None in raw:
+        # csv.DictReader складывает значения сверх заголовка под ключ None
+        raise CatalogError(f"{where}: лишние значения без колонки: {', '.join(map(str, raw[None]))}")
+    unknown = [key for key in raw if key not in schema]
+    if unknown:
+        raise CatalogError(f"{where}: неизвестные поля {', '.join(unknown)}")
+
+    record = {}
+    for key, field in schema.items():
+        value = raw.get(key)
+        if value is None or (from_csv and value.strip() == ''):
+            if field._required:
+                raise CatalogError(f"{where}: нет поля '{key}'")
+            if field._default is not None:
+                record[key] = field._default
+            continue
+        try:
+            record[key] = field.parse(value, from_csv)
+        except ValueError as e:
+            raise CatalogError(f"{where}: поле '{key}': {e}") from None
+    return record
+
+def read_records(path, schema):
+    from_csv = path.endswith('.csv')
+    with open(path, encoding='utf-8', newline='') as f:
+        if from_csv:
+            rows = list(csv.DictReader(f))
+        else:
+            try:
+                rows = json.load(f)
+            except json.JSONDecodeError as e:
+                raise CatalogError(f"{path}: {e}") from None
+            if not isinstance(rows, list):
+                raise CatalogError(f"{path}: ожидался список записей")
+    return [validate_record(row, schema, f"{path}, запись {i + 1}", from_csv) for i, row in enumerate(rows)]
+
+def find_catalog_file(directory, name):
+    for extension in ('.json', '.csv'):
+        path = os.path.join(directory, name + extension)
+        if os.path.exists(path):
+            return path
+    raise CatalogError(f"{directory}: нет файла {name}.json или {name}.csv")
+
+
+def make_effect(record):
+    effect = record['effect']
+    low, high = record.get('min'), record.get('max')
+    if effect == 'steal':
+        return lambda w: w.steal_resources(w._rng.randint(low, high))
+    if effect == 'fire':
+        return lambda w: w.fire_damage()
+    if effect == 'flood':
+        pest_name = record.get('pest')
+        return lambda w: w.flood_damage(pest_name)
+    if effect == 'income':
+        return lambda w: w.add_money(w._rng.randint(low, high))
+    return lambda w: w.add_money(-w._rng.randint(low, high))
+
+
+class Catalog:
+    def __init__(self, resources, pests, poisons, events):
+        self._resources = resources
+        self._pests = pests
+        self._poisons = poisons
+        self._events = events
+        self.check()
+
+        self._pest_names = [p['name'] for p in pests]
+        self._spawn_conditions = [{key: p[key] for key in SPAWN_CONDITIONS if key in p} for p in pests]
+        self._spawn_predicates = [compile_spawn_predicate(c) for c in self._spawn_conditions]
+        # плотная матрица средство × вредитель вместо словаря в каждом try_kill
+        self._effectiveness = [[poison['effectiveness'].get(name, 0.0) for name in self._pest_names]
+                               for poison in poisons]
+
+    def check(self):
+        for name, records in (('resources', self._resources), ('pests', self._pests),
+                              ('poisons', self._poisons), ('events', self._events)):
+            seen = set()
+            for record in records:
+                if record['name'] in seen:
+                    raise CatalogError(f"{name}: повторяется имя '{record['name']}'")
+                seen.add(record['name'])
+
+        pest_names = {p['name'] for p in self._pests}
+        for poison in self._poisons:
+            unknown = [k for k in poison['effectiveness'] if k not in pest_names]
+            if unknown:
+                raise CatalogError(f"poisons: '{poison['name']}' ссылается на неизвестных вредителей: {', '.join(unknown)}")
+        for event in self._events:
+            if event['effect'] not in EFFECTS:
+                raise CatalogError(f"events: '{event['name']}': эффект должен быть одним из {', '.join(EFFECTS)}")
+            if event['effect'] in ('steal', 'income', 'fine'):
+                if 'min' not in event or 'max' not in event or event['min'] > event['max']:
+                    raise CatalogError(f"events: '{event['name']}': нужны min <= max")
+            if event.get('pest') is not None and event['pest'] not in pest_names:
+                raise CatalogError(f"events: '{event['name']}': неизвестный вредитель '{event['pest']}'")
+
+    def digest(self):
+        # отпечаток содержимого: сохранённые партии и расчёты проверяют, что каталог тот же
+        records = [self._resources, self._pests, self._poisons, self._events]
+        data = json.dumps(records, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(data).hexdigest()
+
+    def resource_records(self):
+        return [(r['name'], r['type'], r['value'], r['humidity_sensitive'], r['food']) for r in self._resources]
+
+    def create_pests(self):
+        pests = []
+        for i, record in enumerate(self._pests):
+            pest = Pest(record['name'], record['damage_chance'], self._spawn_conditions[i],
+                        record['affected_types'], self._spawn_predicates[i])
+            pest._index = i
+            pests.append(pest)
+        return pests
+
+    def create_poisons(self):
+        return [Poison(record['name'], record['effectiveness'], record['cost'], self._effectiveness[i])
+                for i, record in enumerate(self._poisons)]
+
+    def create_events(self):
+        events = []
+        for record in self._events:
+            params = {key: record[key] for key in ('min', 'max', 'pest') if key in record}
+            events.append(RandomEvent(record['name'], record['description'], record['probability'],
+                                      make_effect(record), record['effect'], params))
+        return events
+
+
+def load_catalog(directory=DATA_DIR):
+    records = {name: read_records(find_catalog_file(directory, name), SCHEMAS[name]) for name in CATALOG_NAMES}
+    return Catalog(records['resources'], records['pests'], records['poisons'], records['events'])
+
+@lru_cache(maxsize=None)
+def default_catalog():
+    return load_catalog()
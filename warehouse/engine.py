@@ -0,0 +1,349 @@
+import random
+
+from .catalog import default_catalog
+from .objects import GameObject, Resource, Pest, Poison, RandomEvent
+from .store import ResourceStore
+
+START_MONEY = 1000
+START_HUMIDITY = 30
+START_SECURITY = 2
+MAX_SECURITY = 3
+MIN_HUMIDITY = 10
+MAX_HUMIDITY = 90
+HUMIDITY_DRIFT = 10
+SPAWN_CHANCE = 0.5
+REPAIR_COST = 25
+HUMIDITY_REDUCTION = 15
+HUMIDITY_REDUCTION_COST = 50
+SECURITY_UPGRADE_COST = 300
+WIN_DAY = 10
+THEFT_SUCCESS = 0.7
+THEFT_FINE = 0.5
+FIRE_DAMAGE_CHANCE = 0.3
+FIRE_KILL_CHANCE = 0.6
+FLOOD_HUMIDITY = 20
+FLOOD_DAMAGE_CHANCE = 0.5
+FLOOD_MOULD_CHANCE = 0.7
+MOULD_NAME = "Плесень"
+
+
+class DayResult:
+    def __init__(self, day):
+        self._day = day
+        self._rent = 0
+        self._damaged = []
+        self._events = []
+        self._notices = []
+        self._spawned = []
+        self._stolen = []
+        self._won = False
+        self._lost = False
+
+    def get_message(self):
+        message = f"День {self._day} завершен.\nАрендная плата: +{self._rent:.1f}₽"
+        if self._damaged:
+            message += f"\nПовреждены: {', '.join(self._damaged)}"
+        if self._events:
+            message += "\n\nСобытия:\n" + "\n".join(e._description for e in self._events)
+        return message
+
+
+class WarehouseEngine:
+    def __init__(self, rng=None, stats=None, catalog=None, seed=None):
+        if rng is None:
+            # без явного seed всё равно выбираем его сами, чтобы партию можно было повторить
+            seed = random.randrange(1 << 63) if seed is None else seed
+            rng = random.Random(seed)
+        self._seed = seed
+        self._rng = rng
+        self._stats = stats
+        self._catalog = catalog if catalog is not None else default_catalog()
+        self._resources = self.create_store()
+        self._pests = []
+        self._poisons = []
+        self._random_events = []
+        self._money = START_MONEY
+        self._day = 0
+        self._humidity = START_HUMIDITY
+        self._security_level = START_SECURITY
+        self._notices = []
+        self._stolen = []
+        self._actions = None
+        # единиц средств потрачено за всю игру (каждое уничтожение тратит одну)
+        self._poisons_used = 0
+
+        self.create_resources()
+        self.create_pests()
+        self.create_poisons()
+        self.create_events()
+
+    def track_actions(self):
+        if self._actions is None:
+            self._actions = []
+
+    def record_action(self, action, argument=None):
+        # подряд идущие дни сворачиваются в ['next_day', n]
+        actions = self._actions
+        if actions is None:
+            return
+        if action == 'next_day':
+            self.record_days(1)
+        else:
+            actions.append([action, argument])
+
+    def record_days(self, count):
+        actions = self._actions
+        if actions is None or count <= 0:
+            return
+        if actions and actions[-1][0] == 'next_day':
+            actions[-1][1] += count
+        else:
+            actions.append(['next_day', count])
+
+    def create_store(self):
+        return ResourceStore()
+
+    def create_resources(self):
+        for name, r_type, value, hum, food in self._catalog.resource_records():
+            self._resources.add(name, r_type, value, hum, food)
+
+    def create_pests(self):
+        self._pests.extend(self._catalog.create_pests())
+
+    def create_poisons(self):
+        self._poisons.extend(self._catalog.create_poisons())
+
+    def create_events(self):
+        self._random_events.extend(self._catalog.create_events())
+
+    def get_poison(self, name):
+        for poison in self._poisons:
+            if poison._name == name:
+                return poison
+        raise KeyError(name)
+
+    def add_resource(self, resource):
+        return self._resources.append(resource)
+
+    def remove_resource(self, resource):
+        self._resources.remove(resource)
+
+    def damage_resource(self, resource):
+        resource._damaged = True
+
+    def repair_resource(self, resource):
+        resource._damaged = False
+
+    def active_pests(self):
+        return [p for p in self._pests if p._active]
+
+    def owned_poisons(self):
+        return [p for p in self._poisons if p._owned > 0]
+
+    def damaged_resources(self):
+        return self._resources.views(self._resources.damaged_slots())
+
+    def calculate_rent(self):
+        return self._resources.healthy_value() * 0.1
+
+    def is_won(self):
+        return all(not pest._active for pest in self._pests) and self._day > WIN_DAY
+
+    def is_lost(self):
+        return self._money < 0
+
+    def next_day(self):
+        self.record_action('next_day')
+        self._notices = []
+        self._stolen = []
+        result = DayResult(self._day + 1)
+        was_active = [p._active for p in self._pests]
+
+        stats = self._stats
+        mark = stats.start() if stats else None
+
+        self._day += 1
+        self._humidity = max(MIN_HUMIDITY, min(MAX_HUMIDITY, self._humidity + self.humidity_step()))
+        if stats:
+            mark = stats.lap('humidity', mark)
+
+        self.spawn_pests()
+        if stats:
+            mark = stats.lap('spawn_pests', mark)
+
+        for pest in self.active_pests():
+            result._damaged.extend(self.pest_damage(pest))
+        if stats:
+            mark = stats.lap('pest_damage', mark)
+
+        for event in self._random_events:
+            if event.check_event(self):
+                effect_started = stats.start() if stats else None
+                event._effect(self)
+                result._events.append(event)
+                if stats:
+                    stats.lap(f"event:{event._name}", effect_started)
+        if stats:
+            mark = stats.lap('events', mark)
+
+        result._rent = self.calculate_rent()
+        self._money += result._rent
+        if stats:
+            stats.lap('rent', mark)
+            stats.count('days')
+            stats.count('damaged_items', len(result._damaged))
+            stats.count('events_fired', len(result._events))
+
+        result._spawned = [p for p, active in zip(self._pests, was_active) if p._active and not active]
+        result._notices = self._notices
+        result._stolen = self._stolen
+        self._notices = []
+        self._stolen = []
+        result._won = self.is_won()
+        result._lost = self.is_lost()
+        return result
+
+    def humidity_step(self):
+        return self._rng.randint(-HUMIDITY_DRIFT, HUMIDITY_DRIFT)
+
+    def pest_damage(self, pest):
+        damaged = []
+        for resource_type in pest._affected_types:
+            for resource in self._resources.views(self._resources.healthy_slots_of_type(resource_type)):
+                if pest.try_damage(resource, self._rng):
+                    damaged.append(resource._name)
+        return damaged
+
+    def spawn_pests(self):
+        for pest in [p for p in self._pests if not p._active]:
+            if pest.check_spawn_conditions(self):
+                spawn_chance = SPAWN_CHANCE
+                if self._security_level > 1:
+                    spawn_chance /= self._security_level
+
+                if self._rng.random() < spawn_chance:
+                    pest._active = True
+
+    def steal_resources(self, count):
+        stealable = self._resources.healthy_slots()
+        if not stealable:
+            return []
+
+        stolen_slots = self._rng.sample(stealable, min(count, len(stealable)))
+        stolen = [self._resources[slot].copy() for slot in stolen_slots]
+        if not self.theft_succeeds():
+            return []
+
+        self._resources.remove_slots(stolen_slots)
+        self.charge_theft([(r._name, 1) for r in stolen], sum(r._value for r in stolen))
+        return stolen
+
+    def theft_succeeds(self):
+        success_chance = THEFT_SUCCESS / self._security_level
+        if self._rng.random() > success_chance:
+            self._notices.append(("Кража предотвращена", "Охранник поймал вора!"))
+            return False
+        return True
+
+    def charge_theft(self, stolen, total_value):
+        self._stolen.extend(stolen)
+        self._money -= total_value * THEFT_FINE
+        self._notices.append(("Кража", f"Украдено товаров на сумму {total_value}₽! Штраф: {total_value*THEFT_FINE}₽"))
+
+    def damage_share(self, chance):
+        for slot in range(len(self._resources)):
+            if self._rng.random() < chance:
+                self._resources.set_damaged(slot, True)
+
+    def damage_humidity_sensitive(self, chance):
+        for slot in self._resources.humidity_sensitive_slots():
+            if self._rng.random() < chance:
+                self._resources.set_damaged(slot, True)
+
+    def fire_damage(self):
+        self.damage_share(FIRE_DAMAGE_CHANCE)
+
+        for p in self._pests:
+            if p._active and self._rng.random() < FIRE_KILL_CHANCE:
+                p._active = False
+
+    def flood_damage(self, pest_name=MOULD_NAME):
+        self._humidity = min(100, self._humidity + FLOOD_HUMIDITY)
+
+        self.damage_humidity_sensitive(FLOOD_DAMAGE_CHANCE)
+
+        for p in [p for p in self._pests if p._name == pest_name]:
+            if not p._active and self._rng.random() < FLOOD_MOULD_CHANCE:
+                p._active = True
+
+    def add_money(self, amount):
+        self._money += amount
+        if amount >= 0:
+            self._notices.append(("Удача", f"Вы получили {amount}₽"))
+        else:
+            self._notices.append(("Неудача", f"Вы потеряли {-amount}₽"))
+
+    def buy_poison(self, poison):
+        self.record_action('buy', poison._name)
+        if self._money < poison._cost:
+            return False
+        self._money -= poison._cost
+        poison._owned += 1
+        return True
+
+    def use_poison(self, poison):
+        self.record_action('use', poison._name)
+        killed = []
+        for pest in self.active_pests():
+            if poison.try_kill(pest, self._rng):
+                pest._active = False
+                killed.append(pest)
+        self._poisons_used += len(killed)
+        return killed
+
+    def repair_cost(self, count=None):
+        if count is None:
+            count = self._resources.damaged_count()
+        return count * REPAIR_COST
+
+    def affordable_repairs(self):
+        return int(self._money // REPAIR_COST)
+
+    def repair_resources(self, count=None):
+        self.record_action('repair', count)
+        damaged = self.damaged_resources()
+        if count is None or count >= len(damaged):
+            to_repair = damaged
+        else:
+            to_repair = self._rng.sample(damaged, count)
+
+        cost = self.repair_cost(len(to_repair))
+        if not to_repair or self._money < cost:
+            return 0
+
+        self._money -= cost
+        for r in to_repair:
+            self.repair_resource(r)
+        return len(to_repair)
+
+    def reduce_humidity(self):
+        self.record_action('humidity')
+        if self._money < HUMIDITY_REDUCTION_COST:
+            return False
+        self._money -= HUMIDITY_REDUCTION_COST
+        self._humidity = max(MIN_HUMIDITY, self._humidity - HUMIDITY_REDUCTION)
+        return True
+
+    def security_upgrade_cost(self):
+        return SECURITY_UPGRADE_COST * self._security_level
+
+    def upgrade_security(self):
+        self.record_action('security')
+        if self._security_level >= MAX_SECURITY:
+            return False
+        cost = self.security_upgrade_cost()
+        if self._money < cost:
+            return False
+        self._money -= cost
+        self._security_level += 1
+        return True
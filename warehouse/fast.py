@@ -0,0 +1,244 @@
+import math
+
+from .engine import (
+    WarehouseEngine, DayResult, MIN_HUMIDITY, MAX_HUMIDITY, HUMIDITY_DRIFT, SPAWN_CHANCE, WIN_DAY,
+)
+from .objects import RandomEvent
+
+NEVER = float('inf')
+
+
+def geometric(rng, chance):
+    # номер первого успеха (1, 2, ...) в серии испытаний с вероятностью chance — одно число вместо серии
+    if chance >= 1.0:
+        return 1
+    if chance <= 0.0:
+        return NEVER
+    return int(math.log(1.0 - rng.random()) / math.log1p(-chance)) + 1
+
+def skips(rng, count, chance):
+    # номера успешных испытаний из count: прыжками между успехами, а не броском на каждое
+    index = geometric(rng, chance) - 1
+    while index < count:
+        yield index
+        index += geometric(rng, chance)
+
+
+class AliasTable:
+    # выбор из n исходов с заданными весами за O(1) (метод Уокера–Возе)
+    def __init__(self, weights):
+        total = sum(weights)
+        size = len(weights)
+        scaled = [w * size / total for w in weights]
+        self._accept = [1.0] * size
+        self._alias = list(range(size))
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._accept[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+
+    def sample(self, rng):
+        u = rng.random() * len(self._accept)
+        i = int(u)
+        return i if u - i < self._accept[i] else self._alias[i]
+
+
+class ScheduledEvent(RandomEvent):
+    def __init__(self, event, index):
+        super().__init__(event._name, event._description, event._probability, event._effect,
+                         event._kind, event._params)
+        self._index = index
+
+    def check_event(self, warehouse):
+        return warehouse._day == warehouse._event_day and self._index in warehouse._event_set
+
+
+class FastWarehouseEngine(WarehouseEngine):
+    # те же распределения, что у WarehouseEngine, но редкие исходы разыгрываются через время ожидания:
+    # день следующего события — одно геометрическое число, появление вредителя — экспоненциальный порог
+    # накопленного риска, повреждения товаров — прыжки между успехами. Поток случайных чисел другой,
+    # поэтому партию повторяет только этот же класс (replay берёт его из поля 'engine' записи).
+    # Расписание событий и пороги не входят в SaveFile и Timeline.
+    def __init__(self, rng=None, stats=None, catalog=None, seed=None):
+        self._event_day = 0
+        self._event_set = ()
+        self._spawn_clocks = {}
+        super().__init__(rng, stats, catalog, seed)
+
+    def create_events(self):
+        super().create_events()
+        self._random_events = [ScheduledEvent(e, i) for i, e in enumerate(self._random_events)]
+        quiet = 1.0
+        # первое сработавшее событие по порядку: вес = (все до него не сработали) × p
+        first = []
+        for event in self._random_events:
+            first.append(quiet * event._probability)
+            quiet *= 1.0 - event._probability
+        self._event_chance = 1.0 - quiet
+        self._first_event = AliasTable(first) if self._event_chance > 0 else None
+
+    def schedule_events(self):
+        # следующий день хотя бы с одним событием и набор событий этого дня
+        wait = geometric(self._rng, self._event_chance)
+        self._event_day = self._day + wait
+        if wait == NEVER:
+            self._event_set = ()
+            return
+        first = self._first_event.sample(self._rng)
+        fired = {first}
+        for event in self._random_events[first + 1:]:
+            if self._rng.random() < event._probability:
+                fired.add(event._index)
+        self._event_set = fired
+
+    def next_day(self):
+        if self._event_day <= self._day:
+            self.schedule_events()
+        self.arm_clocks()
+        return super().next_day()
+
+    def humidity_step(self):
+        # одно random() вместо randint: тот же равномерный шаг, но заметно дешевле
+        width = 2 * HUMIDITY_DRIFT + 1
+        return int(self._rng.random() * width) - HUMIDITY_DRIFT
+
+    def spawn_hazard(self):
+        spawn_chance = SPAWN_CHANCE
+        if self._security_level > 1:
+            spawn_chance /= self._security_level
+        if spawn_chance <= 0:
+            return 0.0
+        return -math.log1p(-spawn_chance) if spawn_chance < 1.0 else NEVER
+
+    def arm_clocks(self):
+        # порог Exp(1) на каждого неактивного вредителя; тянется до начала дня, чтобы пачка тихих дней
+        # и next_day брали случайные числа в одном порядке. Остаток порога после паузы тоже Exp(1)
+        clocks = self._spawn_clocks
+        for pest in self._pests:
+            if not pest._active and pest._name not in clocks:
+                clocks[pest._name] = -math.log(1.0 - self._rng.random())
+
+    def spawn_pests(self):
+        # риск копится только в дни, когда условия выполнены; это равносильно броску в каждый такой день
+        hazard = self.spawn_hazard()
+        if not hazard:
+            return
+        clocks = self._spawn_clocks
+        for pest in self._pests:
+            if pest._active or not pest.check_spawn_conditions(self):
+                continue
+            clock = clocks.get(pest._name)
+            if clock is None:
+                clock = -math.log(1.0 - self._rng.random())
+            clock -= hazard
+            if clock <= 0:
+                pest._active = True
+                del clocks[pest._name]
+            else:
+                clocks[pest._name] = clock
+
+    def pest_damage(self, pest):
+        damaged = []
+        if not pest._active:
+            return damaged
+        store = self._resources
+        for resource_type in pest._affected_types:
+            slots = store.healthy_slots_of_type(resource_type)
+            for i in skips(self._rng, len(slots), pest._damage_chance):
+                store.set_damaged(slots[i], True)
+                damaged.append(store[slots[i]]._name)
+        return damaged
+
+    def damage_share(self, chance):
+        for slot in skips(self._rng, len(self._resources), chance):
+            self._resources.set_damaged(slot, True)
+
+    def damage_humidity_sensitive(self, chance):
+        slots = self._resources.humidity_sensitive_slots()
+        for i in skips(self._rng, len(slots), chance):
+            self._resources.set_damaged(slots[i], True)
+
+    def _candidates(self):
+        # неактивные вредители, у которых в тихие дни могут сойтись условия: остаются только день и влажность
+        store = self._resources
+        candidates = []
+        for pest in self._pests:
+            conditions = pest._spawn_conditions
+            if pest._active or store.damaged_count() < conditions.get('damaged_resources', 0):
+                continue
+            required = conditions.get('required_resources')
+            if required is not None and not any(store.has_type(t) for t in required):
+                continue
+            candidates.append((pest, conditions.get('min_day', 0), conditions.get('humidity', 0)))
+        return candidates
+
+    def advance(self, days, stop_on_end=True):
+        # days дней подряд; тихие дни (нет вредителей и событий) идут пачкой: влажность, риск появления и аренда.
+        # Возвращает DayResult только непустых дней; случайные числа те же, что у days × next_day().
+        results = []
+        end = self._day + days
+        while self._day < end:
+            if self._event_day <= self._day:
+                self.schedule_events()
+            if self._event_day == self._day + 1 or any(p._active for p in self._pests):
+                result = self.next_day()
+                results.append(result)
+                if stop_on_end and (result._won or result._lost):
+                    break
+                continue
+
+            stop = min(end, self._event_day - 1)
+            if stop_on_end:
+                # первый тихий день после WIN_DAY — уже победа, а с долгом проигрыш наступает сразу
+                stop = min(stop, max(self._day + 1, WIN_DAY + 1))
+                if self._money < 0:
+                    stop = self._day + 1
+            self.arm_clocks()
+            self._notices = []
+            self._stolen = []
+            candidates = self._candidates()
+            clocks = self._spawn_clocks
+            hazard = self.spawn_hazard()
+            rent = self.calculate_rent()
+            random = self._rng.random
+            width = 2 * HUMIDITY_DRIFT + 1
+            day, humidity, money = self._day, self._humidity, self._money
+            spawned = False
+            while day < stop:
+                day += 1
+                humidity = max(MIN_HUMIDITY, min(MAX_HUMIDITY, humidity + int(random() * width) - HUMIDITY_DRIFT))
+                for pest, min_day, min_humidity in candidates:
+                    if day >= min_day and humidity >= min_humidity and hazard:
+                        clock = clocks[pest._name] - hazard
+                        if clock <= 0:
+                            pest._active = True
+                            del clocks[pest._name]
+                            spawned = True
+                        else:
+                            clocks[pest._name] = clock
+                if spawned:
+                    break
+                money += rent
+            self.record_days(day - self._day)
+            self._day, self._humidity, self._money = day, humidity, money
+            if spawned:
+                results.append(self._finish_day())
+            if stop_on_end and self._day > 0 and (self.is_won() or self.is_lost()):
+                break
+        return results
+
+    def _finish_day(self):
+        # тихий день, в который всё-таки появился вредитель: урон и аренда как в next_day, событий нет
+        result = DayResult(self._day)
+        for pest in self.active_pests():
+            result._damaged.extend(self.pest_damage(pest))
+        result._rent = self.calculate_rent()
+        self._money += result._rent
+        result._spawned = self.active_pests()
+        result._won = self.is_won()
+        result._lost = self.is_lost()
+        return result
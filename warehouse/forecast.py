@@ -0,0 +1,342 @@
+from .engine import (
+    MIN_HUMIDITY, MAX_HUMIDITY, HUMIDITY_DRIFT, SPAWN_CHANCE, THEFT_SUCCESS, THEFT_FINE,
+    FIRE_DAMAGE_CHANCE, FIRE_KILL_CHANCE, FLOOD_HUMIDITY, FLOOD_DAMAGE_CHANCE, FLOOD_MOULD_CHANCE,
+)
+
+FORECAST_DAYS = 7
+MEMO_SIZE = 1024
+# наводнение поднимает влажность до 100, а не до MAX_HUMIDITY
+HUMIDITY_LIMIT = 100
+
+
+def drift(weights):
+    # распределение влажности после randint(-HUMIDITY_DRIFT, HUMIDITY_DRIFT) с обрезкой по краям
+    width = 2 * HUMIDITY_DRIFT + 1
+    prefix = [0.0]
+    for weight in weights:
+        prefix.append(prefix[-1] + weight)
+    last = len(weights)
+    drifted = [0.0] * last
+    for h in range(MIN_HUMIDITY, MAX_HUMIDITY + 1):
+        drifted[h] = (prefix[min(last, h + HUMIDITY_DRIFT + 1)] - prefix[max(0, h - HUMIDITY_DRIFT)]) / width
+    # сдвиг за край достаётся только тем, кто стоит ближе HUMIDITY_DRIFT к границе
+    for h in range(0, min(last, MIN_HUMIDITY + HUMIDITY_DRIFT)):
+        if weights[h]:
+            drifted[MIN_HUMIDITY] += weights[h] * min(width, MIN_HUMIDITY - h + HUMIDITY_DRIFT) / width
+    for h in range(max(0, MAX_HUMIDITY - HUMIDITY_DRIFT + 1), last):
+        if weights[h]:
+            drifted[MAX_HUMIDITY] += weights[h] * min(width, h + HUMIDITY_DRIFT - MAX_HUMIDITY) / width
+    return drifted
+
+
+class DayForecast:
+    def __init__(self, offset):
+        self._offset = offset
+        self._damaged = {}
+        self._spawn = {}
+        self._active = {}
+        self._events = {}
+        self._rent = 0.0
+        # изменение денег с сегодняшнего дня: сами деньги в ключ памяти не входят
+        self._money_change = 0.0
+
+
+class RiskForecast:
+    # ожидания по тем же параметрам, что и next_day, без прогона случайных партий
+    def __init__(self, engine):
+        self._engine = engine
+        self._memo = {}
+        min_days = [p._spawn_conditions.get('min_day', 0) for p in engine._pests]
+        self._last_min_day = max(min_days, default=0)
+        self._required = sorted({t for p in engine._pests for t in p._spawn_conditions.get('required_resources', ())})
+        # для появления важен только порог влажности, поэтому влажность сводится к этим уровням
+        self._levels = sorted({0} | {p._spawn_conditions.get('humidity', 0) for p in engine._pests})
+
+    def _key(self, days):
+        engine = self._engine
+        store = engine._resources
+        totals = store.healthy_totals()
+        return (days, min(engine._day, self._last_min_day), engine._humidity, engine._security_level,
+                tuple(p._active for p in engine._pests), store.damaged_count(),
+                tuple(store.has_type(t) for t in self._required), tuple(sorted(totals.items())))
+
+    def forecast(self, days=FORECAST_DAYS):
+        key = self._key(days)
+        result = self._memo.get(key)
+        if result is None:
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            result = self._memo[key] = self._compute(*key)
+        return result
+
+    def _compute(self, days, day, humidity, security, active, damaged, present, totals):
+        # состояние — распределение по (маска активных вредителей, повреждённых до порога). В строке
+        # состояния лежат его вес и ожидаемое число целых в каждой группе (тип, чувствителен к
+        # влажности), умноженное на вес, так что истощение учитывается именно в тех мирах, где
+        # вредитель активен. Влажность ведётся отдельно для каждого набора активных вредителей с
+        # порогом по влажности. Кражи не убирают тип со склада целиком.
+        pests = self._engine._pests
+        events = self._engine._random_events
+        groups = []
+        for resource_type, (count, value, sensitive_count, sensitive_value) in totals:
+            if count > sensitive_count:
+                groups.append((resource_type, False, count - sensitive_count, value - sensitive_value))
+            if sensitive_count:
+                groups.append((resource_type, True, sensitive_count, sensitive_value))
+        unit_values = [group[3] / group[2] for group in groups]
+        affected = [[g for g, group in enumerate(groups) if group[0] in p._affected_types] for p in pests]
+        conditions = [p._spawn_conditions for p in pests]
+        # дальше порога повреждённые не различаются: условию damaged_resources важно только «не меньше»
+        limit = max((c.get('damaged_resources', 0) for c in conditions), default=0)
+        gated = sum(1 << i for i, c in enumerate(conditions) if c.get('humidity', 0) > self._levels[0])
+        spawnable = [self._has_required(c, present) for c in conditions]
+        spawn_chance = SPAWN_CHANCE / security if security > 1 else SPAWN_CHANCE
+        theft_success = min(1.0, THEFT_SUCCESS / security)
+        mask = sum(1 << i for i, a in enumerate(active) if a)
+        states = {(mask, min(damaged, limit)): [1.0] + [float(group[2]) for group in groups]}
+        climate = {(mask & gated,): [0.0] * (HUMIDITY_LIMIT + 1)}
+        climate[mask & gated,][humidity] = 1.0
+        pest_hits = {}
+        everything = [FIRE_DAMAGE_CHANCE] * len(groups)
+        sensitive = [FLOOD_DAMAGE_CHANCE if group[1] else 0.0 for group in groups]
+        money = 0.0
+
+        forecasts = []
+        for offset in range(1, days + 1):
+            today = day + offset
+            forecast = DayForecast(offset)
+
+            climate = {key: drift(weights) for key, weights in climate.items()}
+            candidates = [i for i, c in enumerate(conditions) if spawnable[i] and today >= c.get('min_day', 0)]
+            states, climate, spawned = self._spawn(states, climate, gated, candidates, conditions, spawn_chance)
+
+            lost = [0.0] * len(groups)
+            for mask, _ in states:
+                if mask not in pest_hits:
+                    pest_hits[mask] = self._pest_hits(mask, pests, affected, len(groups))
+            states = _damage(states, lambda mask: pest_hits[mask], limit, lost, 1.0)
+
+            for event in events:
+                p = event._probability
+                forecast._events[event._name] = p
+                kind = event._kind
+                params = event._params
+                if kind == 'steal':
+                    counts = range(params['min'], params['max'] + 1)
+                    for row in states.values():
+                        healthy = sum(row[1:]) / row[0]
+                        if healthy <= 0:
+                            continue
+                        share = p * theft_success * sum(min(1.0, c / healthy) for c in counts) / len(counts)
+                        money -= share * THEFT_FINE * sum(v * a for v, a in zip(unit_values, row[1:]))
+                        row[1:] = [a * (1.0 - share) for a in row[1:]]
+                elif kind == 'fire':
+                    states = _mix(states, _survivors(_damage(states, lambda mask: everything, limit, lost, p)), p)
+                    climate = _mix(climate, _survivors(climate), p)
+                elif kind == 'flood':
+                    fired = _damage(states, lambda mask: sensitive, limit, lost, p)
+                    soaked = {}
+                    for key, weights in climate.items():
+                        flooded = soaked[key] = [0.0] * (HUMIDITY_LIMIT + 1)
+                        for h, weight in enumerate(weights):
+                            if weight:
+                                flooded[min(HUMIDITY_LIMIT, h + FLOOD_HUMIDITY)] += weight
+                    for i in [i for i, pest in enumerate(pests) if pest._name == params.get('pest')]:
+                        bit = 1 << i
+                        spawned[i] += p * FLOOD_MOULD_CHANCE * sum(row[0] for (mask, _), row in fired.items()
+                                                                   if not mask & bit)
+                        fired = _mould(fired, bit)
+                        if bit & gated:
+                            soaked = _mould(soaked, bit)
+                    states = _mix(states, fired, p)
+                    climate = _mix(climate, soaked, p)
+                elif kind == 'income':
+                    money += p * (params['min'] + params['max']) / 2
+                elif kind == 'fine':
+                    money -= p * (params['min'] + params['max']) / 2
+
+            for group, count in zip(groups, lost):
+                forecast._damaged[group[0]] = forecast._damaged.get(group[0], 0.0) + count
+            for i, pest in enumerate(pests):
+                forecast._spawn[pest._name] = spawned[i]
+                forecast._active[pest._name] = sum(row[0] for (mask, _), row in states.items() if mask >> i & 1)
+            forecast._rent = sum(v * a for row in states.values() for v, a in zip(unit_values, row[1:])) * 0.1
+            money += forecast._rent
+            forecast._money_change = money
+            forecasts.append(forecast)
+        return forecasts
+
+    def _has_required(self, conditions, present):
+        required = conditions.get('required_resources')
+        if required is None:
+            return True
+        return any(present[self._required.index(t)] for t in required)
+
+    def _spawn(self, states, climate, gated, candidates, conditions, chance):
+        # каждый подходящий неактивный вредитель появляется независимо; условия по влажности
+        # и числу повреждённых проверяются внутри состояния, а не на средних
+        bounds = list(zip(self._levels, self._levels[1:] + [HUMIDITY_LIMIT + 1]))
+        levels = {}
+        for key, weights in climate.items():
+            total = sum(weights)
+            levels[key] = [sum(weights[low:high]) / total if total else 0.0 for low, high in bounds]
+        result = {}
+        spawned = [0.0] * len(conditions)
+        moved = {}
+        for (mask, k), row in states.items():
+            key = (mask & gated,)
+            outcome = {}
+            for j, ((level, _), share) in enumerate(zip(bounds, levels[key])):
+                if not share:
+                    continue
+                weight = row[0] * share
+                targets = moved.setdefault((key, j), {})
+                branches = {mask: 1.0}
+                for i in candidates:
+                    if mask >> i & 1 or level < conditions[i].get('humidity', 0) or k < conditions[i].get('damaged_resources', 0):
+                        continue
+                    spawned[i] += weight * chance
+                    split = {}
+                    for m, w in branches.items():
+                        split[m] = split.get(m, 0.0) + w * (1.0 - chance)
+                        split[m | 1 << i] = split.get(m | 1 << i, 0.0) + w * chance
+                    branches = split
+                for m, w in branches.items():
+                    outcome[m] = outcome.get(m, 0.0) + w * share
+                    targets[m & gated,] = targets.get((m & gated,), 0.0) + weight * w
+            for m, w in outcome.items():
+                _add(result, (m, k), w, row)
+        # влажность уровня уходит вместе с мирами, где на этом уровне появился вредитель с порогом
+        moved_climate = {}
+        for (key, j), targets in moved.items():
+            low, high = bounds[j]
+            part = [0.0] * (HUMIDITY_LIMIT + 1)
+            part[low:high] = climate[key][low:high]
+            total = sum(targets.values())
+            for target, mass in targets.items():
+                _add(moved_climate, target, mass / total, part)
+        return result, moved_climate, spawned
+
+    def _pest_hits(self, mask, pests, affected, size):
+        kept = [1.0] * size
+        for i, pest in enumerate(pests):
+            if mask >> i & 1:
+                for g in affected[i]:
+                    kept[g] *= 1.0 - pest._damage_chance
+        return [1.0 - k for k in kept]
+
+
+def _add(states, key, share, row):
+    if not share:
+        return
+    target = states.get(key)
+    if target is None:
+        states[key] = [share * x for x in row]
+    else:
+        states[key] = [t + share * x for t, x in zip(target, row)]
+
+
+def _mix(states, fired, p):
+    result = {key: [(1.0 - p) * x for x in row] for key, row in states.items()}
+    for key, row in fired.items():
+        _add(result, key, p, row)
+    return result
+
+
+def _mould(states, bit):
+    # наводнение будит вредителя с этим битом с шансом FLOOD_MOULD_CHANCE, если он ещё не активен
+    result = {}
+    for key, row in states.items():
+        if key[0] & bit:
+            _add(result, key, 1.0, row)
+            continue
+        _add(result, (key[0] | bit,) + key[1:], FLOOD_MOULD_CHANCE, row)
+        _add(result, key, 1.0 - FLOOD_MOULD_CHANCE, row)
+    return result
+
+
+def _survivors(states):
+    # каждый активный вредитель независимо гибнет в пожаре с шансом FIRE_KILL_CHANCE
+    result = {}
+    for key, row in states.items():
+        branches = {key[0]: 1.0}
+        bit = 1
+        while bit <= key[0]:
+            if key[0] & bit:
+                split = {}
+                for m, w in branches.items():
+                    split[m] = split.get(m, 0.0) + w * (1.0 - FIRE_KILL_CHANCE)
+                    split[m & ~bit] = split.get(m & ~bit, 0.0) + w * FIRE_KILL_CHANCE
+                branches = split
+            bit <<= 1
+        for m, w in branches.items():
+            _add(result, (m,) + key[1:], w, row)
+    return result
+
+
+def _new_damage(alive, hits, limit):
+    # P(ровно j новых повреждений) для j < limit, в каждой группе Binomial(alive, hit);
+    # alive — ожидаемое число целых и может быть дробным
+    probs = [1.0] + [0.0] * (limit - 1)
+    for n, hit in zip(alive, hits):
+        if hit <= 0.0 or n <= 0.0:
+            continue
+        if hit >= 1.0:
+            certain = round(n)
+            probs = [0.0] * min(certain, limit) + probs[:max(0, limit - certain)]
+            continue
+        ratio = hit / (1.0 - hit)
+        coeffs = [(1.0 - hit) ** n]
+        for j in range(1, limit):
+            coeffs.append(max(0.0, coeffs[-1] * (n - j + 1) / j * ratio))
+        probs = [sum(probs[i] * coeffs[j - i] for i in range(j + 1)) for j in range(limit)]
+    return probs
+
+
+def _damage(states, hits_of, limit, lost, scale):
+    # целые в каждом состоянии портятся с шансом hits_of(mask)[g]; число новых повреждённых
+    # переводит состояние к следующему уровню до порога limit
+    result = {}
+    for (mask, k), row in states.items():
+        hits = hits_of(mask)
+        if not any(hits):
+            _add(result, (mask, k), 1.0, row)
+            continue
+        alive = row[1:]
+        after = [row[0]] + [a * (1.0 - h) for a, h in zip(alive, hits)]
+        for g, (a, h) in enumerate(zip(alive, hits)):
+            lost[g] += scale * a * h
+        if k >= limit:
+            _add(result, (mask, k), 1.0, after)
+            continue
+        probs = _new_damage([a / row[0] for a in alive], hits, limit - k)
+        for j, p in enumerate(probs):
+            if p:
+                _add(result, (mask, k + j), p, after)
+        rest = 1.0 - sum(probs)
+        if rest > 0.0:
+            _add(result, (mask, limit), rest, after)
+    return result
+
+
+def format_lines(forecasts, engine):
+    # завтра и итог за весь горизонт; для вредителей — шанс появиться завтра и быть активным в последний день
+    if not forecasts:
+        return []
+    active = {p._name for p in engine.active_pests()}
+    first, last = forecasts[0], forecasts[-1]
+    days = len(forecasts)
+    lines = [f"{'':<22}{'завтра':>10}{f'за {days} дн.':>12}"]
+    for resource_type in first._damaged:
+        total = sum(f._damaged[resource_type] for f in forecasts)
+        lines.append(f"{'урон: ' + resource_type:<22}{first._damaged[resource_type]:>10.2f}{total:>12.2f}")
+    for name in first._spawn:
+        if name in active:
+            continue
+        lines.append(f"{'появится: ' + name:<22}{first._spawn[name]:>10.0%}{last._active[name]:>12.0%}")
+    for name, p in first._events.items():
+        lines.append(f"{'событие: ' + name:<22}{p:>10.0%}{1 - (1 - p) ** days:>12.0%}")
+    lines.append(f"{'аренда':<22}{first._rent:>10.1f}{sum(f._rent for f in forecasts):>12.1f}")
+    money = engine._money
+    lines.append(f"{'деньги':<22}{money + first._money_change:>10.1f}{money + last._money_change:>12.1f}")
+    return lines
@@ -0,0 +1,709 @@
+import argparse
+import threading
+import tkinter as tk
+from tkinter import filedialog, messagebox
+
+from .engine import (
+    WarehouseEngine, MAX_SECURITY, HUMIDITY_REDUCTION, HUMIDITY_REDUCTION_COST,
+)
+from .forecast import FORECAST_DAYS, RiskForecast, format_lines
+from .replay import ReplayError, save_record
+from .savefile import SaveFile, SaveError
+from .stats import PhaseStats
+from .timeline import Timeline
+from .widgets import VirtualListbox, EventLog
+
+try:
+    from .planner import describe, load_planner
+except ImportError:
+    # подсказкам нужен numpy; без него игра просто идёт без них
+    load_planner = None
+
+FAST_FORWARD_BATCH = 25
+STATS_REFRESH_MS = 500
+PLANNER_POLL_MS = 500
+
+
+class WarehouseGame:
+    def __init__(self, root):
+        self._root = root
+        self._root.title("Борьба с вредителями на складе")
+        self._root.configure(bg='#B1E0F2')
+
+        self._stats = PhaseStats()
+        self._stats_window = None
+        self._stats_job = None
+        self._engine = WarehouseEngine(stats=self._stats)
+        self._engine._resources.track_changes()
+        self._engine.track_actions()
+        self._timeline = Timeline(self._engine)
+        self._timeline_window = None
+        self._forecast = RiskForecast(self._engine)
+        self._forecast_window = None
+        self._save = None
+        self._pest_rows = []
+        self._inventory_rows = []
+        self._forward_job = None
+        self._forward_left = 0
+        self._game_over = False
+        self._planner = None
+        self._planner_box = []
+
+        self.setup_ui()
+        self.start_planner()
+
+    def setup_ui(self):
+        self._top_frame = tk.Frame(self._root, bg='#B1E0F2')
+        self._top_frame.pack(pady=10)
+
+        self._middle_frame = tk.Frame(self._root, bg='#B1E0F2')
+        self._middle_frame.pack(pady=10)
+
+        self._bottom_frame = tk.Frame(self._root, bg='#B1E0F2')
+        self._bottom_frame.pack(pady=10)
+
+        self._info_label = tk.Label(self._top_frame,
+                                   text=self.get_info_text(),
+                                   font=('Arial', 12), bg='#B1E0F2')
+        self._info_label.pack()
+
+        self._hint_label = tk.Label(self._top_frame, text="", font=('Arial', 10, 'italic'), bg='#B1E0F2')
+        self._hint_label.pack()
+
+        self._resources_label = tk.Label(self._middle_frame, text="Ресурсы на складе:",
+                                       font=('Arial', 12), bg='#B1E0F2')
+        self._resources_label.pack(anchor='w')
+
+        self._resources_listbox = VirtualListbox(self._middle_frame, 8,
+                                                 lambda: len(self._engine._resources),
+                                                 lambda i: self._engine._resources[i].get_info(),
+                                                 width=70, bg='white', fg='black', selectbackground='#A4D8F2')
+        self._resources_listbox.pack()
+        self.update_resources_list()
+
+        self._pests_label = tk.Label(self._middle_frame, text="Активные вредители:",
+                                    font=('Arial', 12), bg='#B1E0F2')
+        self._pests_label.pack(anchor='w', pady=(10, 0))
+
+        self._pests_listbox = VirtualListbox(self._middle_frame, 3,
+                                             lambda: len(self._pest_rows), lambda i: self._pest_rows[i],
+                                             width=70, bg='white', fg='black', selectbackground='#A4D8F2')
+        self._pests_listbox.pack()
+        self.update_pests_list()
+
+        self._inventory_label = tk.Label(self._middle_frame, text="Ваши средства:",
+                                       font=('Arial', 12), bg='#B1E0F2')
+        self._inventory_label.pack(anchor='w', pady=(10, 0))
+
+        self._inventory_listbox = VirtualListbox(self._middle_frame, 3,
+                                                 lambda: len(self._inventory_rows), lambda i: self._inventory_rows[i],
+                                                 width=70, bg='white', fg='black', selectbackground='#A4D8F2')
+        self._inventory_listbox.pack()
+        self.update_inventory_list()
+
+        button_style = {'width':15, 'bg':'#7FB3D5', 'activebackground':'#5D8BF4',
+                       'fg':'white', 'font':('Arial', 10)}
+
+        self._next_day_btn = tk.Button(self._bottom_frame, text="Следующий день",
+                                      command=self.next_day, **button_style)
+        self._next_day_btn.pack(side='left', padx=5)
+
+        self._buy_poison_btn = tk.Button(self._bottom_frame, text="Купить средство",
+                                        command=self.buy_poison_menu, **button_style)
+        self._buy_poison_btn.pack(side='left', padx=5)
+
+        self._use_poison_btn = tk.Button(self._bottom_frame, text="Использовать средство",
+                                        command=self.use_poison_menu, **button_style)
+        self._use_poison_btn.pack(side='left', padx=5)
+
+        self._repair_btn = tk.Button(self._bottom_frame, text="Починить ресурсы",
+                                    command=self.repair_resources_menu, **button_style)
+        self._repair_btn.pack(side='left', padx=5)
+
+        self._manage_btn = tk.Button(self._bottom_frame, text="Управление складом",
+                                    command=self.manage_warehouse, **button_style)
+        self._manage_btn.pack(side='left', padx=5)
+
+        self._forward_frame = tk.Frame(self._root, bg='#B1E0F2')
+        self._forward_frame.pack(pady=(0, 10))
+
+        self._forward_days = tk.IntVar(self._root, value=30)
+        self._forward_money = tk.IntVar(self._root, value=100)
+        self._stop_on_pest = tk.BooleanVar(self._root, value=True)
+        self._stop_on_theft = tk.BooleanVar(self._root, value=True)
+
+        tk.Label(self._forward_frame, text="Дней:", bg='#B1E0F2').pack(side='left')
+        tk.Spinbox(self._forward_frame, from_=1, to=100000, width=6,
+                   textvariable=self._forward_days).pack(side='left', padx=(0, 10))
+        tk.Label(self._forward_frame, text="Стоп, если деньги <", bg='#B1E0F2').pack(side='left')
+        tk.Spinbox(self._forward_frame, from_=-100000, to=1000000, increment=50, width=7,
+                   textvariable=self._forward_money).pack(side='left', padx=(0, 10))
+        tk.Checkbutton(self._forward_frame, text="новый вредитель", variable=self._stop_on_pest,
+                       bg='#B1E0F2').pack(side='left')
+        tk.Checkbutton(self._forward_frame, text="кража", variable=self._stop_on_theft,
+                       bg='#B1E0F2').pack(side='left')
+
+        self._forward_btn = tk.Button(self._forward_frame, text="Промотать",
+                                      command=self.fast_forward, **button_style)
+        self._forward_btn.pack(side='left', padx=5)
+        self._stop_btn = tk.Button(self._forward_frame, text="Стоп", state='disabled',
+                                   command=self.stop_fast_forward, **button_style)
+        self._stop_btn.pack(side='left', padx=5)
+        self._stats_btn = tk.Button(self._forward_frame, text="Статистика",
+                                    command=self.toggle_stats_panel, **button_style)
+        self._stats_btn.pack(side='left', padx=5)
+        self._save_btn = tk.Button(self._forward_frame, text="Сохранить",
+                                   command=self.save_game, **button_style)
+        self._save_btn.pack(side='left', padx=5)
+        self._load_btn = tk.Button(self._forward_frame, text="Загрузить",
+                                   command=self.load_game, **button_style)
+        self._load_btn.pack(side='left', padx=5)
+        self._record_btn = tk.Button(self._forward_frame, text="Запись партии",
+                                     command=self.save_replay, **button_style)
+        self._record_btn.pack(side='left', padx=5)
+        self._undo_btn = tk.Button(self._forward_frame, text="Отменить",
+                                   command=self.undo, **button_style)
+        self._undo_btn.pack(side='left', padx=5)
+        self._timeline_btn = tk.Button(self._forward_frame, text="Ветки",
+                                       command=self.toggle_timeline, **button_style)
+        self._timeline_btn.pack(side='left', padx=5)
+        self._forecast_btn = tk.Button(self._forward_frame, text="Прогноз",
+                                       command=self.toggle_forecast_panel, **button_style)
+        self._forecast_btn.pack(side='left', padx=5)
+
+        self._log_label = tk.Label(self._root, text="События:", font=('Arial', 12), bg='#B1E0F2')
+        self._log_label.pack(anchor='w', padx=10)
+        self._event_log = EventLog(self._root, height=8, width=80, bg='white', fg='black')
+        self._event_log.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+
+        self._action_buttons = [self._next_day_btn, self._buy_poison_btn, self._use_poison_btn,
+                                self._repair_btn, self._manage_btn, self._forward_btn,
+                                self._undo_btn, self._timeline_btn]
+
+    def get_info_text(self):
+        engine = self._engine
+        return f"День: {engine._day} | Деньги: {engine._money}₽ | Влажность: {engine._humidity}% | Безопасность: {'★'*engine._security_level}"
+
+    def update_resources_list(self):
+        self._resources_listbox.refresh(self._engine._resources.pop_changes())
+
+    def update_pests_list(self):
+        active_pests = self._engine.active_pests()
+        if not active_pests:
+            self._pest_rows = ["Нет активных вредителей"]
+        else:
+            self._pest_rows = [f"{pest._name} (шанс повреждения: {int(pest._damage_chance*100)}%)"
+                               for pest in active_pests]
+        self._pests_listbox.refresh()
+
+    def update_inventory_list(self):
+        owned_poisons = self._engine.owned_poisons()
+        if not owned_poisons:
+            self._inventory_rows = ["Нет средств для борьбы"]
+        else:
+            self._inventory_rows = [f"{poison._name}: {poison._owned} шт." for poison in owned_poisons]
+        self._inventory_listbox.refresh()
+
+    def update_info_label(self):
+        text = self.get_info_text()
+        if text != self._info_label.cget('text'):
+            self._info_label.config(text=text)
+        self.update_hint()
+        self.update_forecast_panel()
+
+    def start_planner(self):
+        if load_planner is None:
+            return
+        self._hint_label.config(text="Совет: считается таблица рекомендаций…")
+        # расчёт идёт один раз на каталог, дальше таблица читается из кэша
+        box = self._planner_box
+        catalog = self._engine._catalog
+
+        def compute():
+            try:
+                box.append(load_planner(catalog))
+            except Exception:
+                # PlannerError на большом каталоге, ошибка numpy или кэша: игра идёт без подсказок
+                box.append(None)
+
+        threading.Thread(target=compute, daemon=True).start()
+        self._root.after(PLANNER_POLL_MS, self._poll_planner)
+
+    def _poll_planner(self):
+        if not self._planner_box:
+            self._root.after(PLANNER_POLL_MS, self._poll_planner)
+            return
+        self._planner = self._planner_box[0]
+        if self._planner is None:
+            self._hint_label.config(text="")
+            return
+        self.update_hint()
+
+    def update_hint(self):
+        if self._planner is None:
+            return
+        if self._game_over:
+            text = ""
+        else:
+            action, win = self._planner.recommend(self._engine)
+            text = f"Совет: {describe(action)} (шанс победы по советам ≈ {win:.0%})"
+        if text != self._hint_label.cget('text'):
+            self._hint_label.config(text=text)
+
+    def refresh_view(self):
+        stats = self._stats
+        mark = stats.start()
+        self.update_info_label()
+        mark = stats.lap('ui:update_info_label', mark)
+        self.update_resources_list()
+        mark = stats.lap('ui:update_resources_list', mark)
+        self.update_pests_list()
+        mark = stats.lap('ui:update_pests_list', mark)
+        self.update_inventory_list()
+        stats.lap('ui:update_inventory_list', mark)
+
+    def toggle_stats_panel(self):
+        if self._stats_window is not None:
+            if self._stats_job is not None:
+                self._root.after_cancel(self._stats_job)
+                self._stats_job = None
+            self._stats_window.destroy()
+            self._stats_window = None
+            return
+
+        self._stats_window = tk.Toplevel(self._root)
+        self._stats_window.title("Статистика дня")
+        self._stats_window.configure(bg='#B1E0F2')
+        self._stats_window.protocol("WM_DELETE_WINDOW", self.toggle_stats_panel)
+
+        self._stats_label = tk.Label(self._stats_window, font=('Courier', 10), justify='left',
+                                     anchor='w', bg='white')
+        self._stats_label.pack(fill='both', expand=True, padx=10, pady=10)
+
+        buttons = tk.Frame(self._stats_window, bg='#B1E0F2')
+        buttons.pack(pady=(0, 10))
+        tk.Button(buttons, text="Сбросить", command=self._stats.reset,
+                  bg='#7FB3D5', activebackground='#5D8BF4', fg='white').pack(side='left', padx=5)
+        tk.Button(buttons, text="Сохранить в файл", command=self.dump_stats,
+                  bg='#7FB3D5', activebackground='#5D8BF4', fg='white').pack(side='left', padx=5)
+        self._refresh_stats_panel()
+
+    def toggle_forecast_panel(self):
+        if self._forecast_window is not None:
+            self._forecast_window.destroy()
+            self._forecast_window = None
+            return
+
+        self._forecast_window = tk.Toplevel(self._root)
+        self._forecast_window.title("Прогноз рисков")
+        self._forecast_window.configure(bg='#B1E0F2')
+        self._forecast_window.protocol("WM_DELETE_WINDOW", self.toggle_forecast_panel)
+
+        options = tk.Frame(self._forecast_window, bg='#B1E0F2')
+        options.pack(pady=(10, 0))
+        self._forecast_days = tk.IntVar(self._forecast_window, value=FORECAST_DAYS)
+        tk.Label(options, text="Дней вперёд:", bg='#B1E0F2').pack(side='left')
+        tk.Spinbox(options, from_=1, to=60, width=4, textvariable=self._forecast_days,
+                   command=self.update_forecast_panel).pack(side='left')
+
+        self._forecast_label = tk.Label(self._forecast_window, font=('Courier', 10), justify='left',
+                                        anchor='w', bg='white')
+        self._forecast_label.pack(fill='both', expand=True, padx=10, pady=10)
+        self.update_forecast_panel()
+
+    def update_forecast_panel(self):
+        # прогноз запоминается по состоянию склада, поэтому его можно звать на каждом обновлении
+        if self._forecast_window is None:
+            return
+        try:
+            days = max(1, self._forecast_days.get())
+        except tk.TclError:
+            days = FORECAST_DAYS
+        text = "\n".join(format_lines(self._forecast.forecast(days), self._engine))
+        if text != self._forecast_label.cget('text'):
+            self._forecast_label.config(text=text)
+
+    def _refresh_stats_panel(self):
+        if self._stats_window is None:
+            return
+        self._stats_label.config(text="\n".join(self._stats.format_lines()))
+        self._stats_job = self._root.after(STATS_REFRESH_MS, self._refresh_stats_panel)
+
+    def dump_stats(self):
+        path = filedialog.asksaveasfilename(defaultextension='.json',
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            self._stats.dump(path)
+            self.notify("Статистика", f"Сохранено в {path}")
+
+    def save_game(self):
+        path = filedialog.asksaveasfilename(defaultextension='.sav',
+                                            filetypes=[("Сохранение склада", "*.sav")])
+        if not path:
+            return
+        save = SaveFile(path)
+        try:
+            save.save(self._engine)
+        except (OSError, SaveError) as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить: {e}")
+            return
+        # дальше каждый день и действие дописываются в журнал рядом со снимком
+        self._save = save
+        self.notify("Сохранение", f"Игра сохранена в {path}")
+
+    def write_save(self, write, *args):
+        try:
+            write(self._engine, *args)
+        except (OSError, SaveError) as e:
+            # партия идёт дальше, но без сохранения: журнал уже не сходится с движком
+            self._save = None
+            self.notify("Ошибка", f"Сохранение остановлено: {e}")
+
+    def load_game(self):
+        path = filedialog.askopenfilename(filetypes=[("Сохранение склада", "*.sav")])
+        if not path:
+            return
+        save = SaveFile(path)
+        try:
+            engine = save.load(stats=self._stats)
+        except (OSError, SaveError) as e:
+            messagebox.showerror("Ошибка", f"Не удалось загрузить: {e}")
+            return
+
+        self.stop_fast_forward()
+        self._engine = engine
+        self._save = save
+        self._engine._resources.track_changes()
+        self._timeline = Timeline(engine)
+        self._forecast = RiskForecast(engine)
+        if self._timeline_window is not None:
+            self._timeline_listbox.refresh()
+        self._resources_listbox.refresh()
+        self.refresh_view()
+        self.update_game_over()
+        self.notify("Загрузка", f"Загружен день {engine._day} из {path}")
+
+    def update_game_over(self):
+        engine = self._engine
+        self._game_over = engine.is_won() or engine.is_lost()
+        self.set_actions_state('disabled' if self._game_over else 'normal')
+        self.update_hint()
+        # к прошлым развилкам можно вернуться и после конца игры
+        self._undo_btn.config(state='normal')
+        self._timeline_btn.config(state='normal')
+
+    def undo(self):
+        node = self._timeline.undo()
+        if node is None:
+            self.notify("Информация", "Отменять нечего")
+            return
+        self.after_checkout(f"Вернулись к: {node._label}")
+
+    def toggle_timeline(self):
+        if self._timeline_window is not None:
+            self._timeline_window.destroy()
+            self._timeline_window = None
+            return
+
+        self._timeline_window = tk.Toplevel(self._root)
+        self._timeline_window.title("Ветки партии")
+        self._timeline_window.configure(bg='#B1E0F2')
+        self._timeline_window.protocol("WM_DELETE_WINDOW", self.toggle_timeline)
+
+        self._timeline_listbox = VirtualListbox(self._timeline_window, 15, lambda: len(self._timeline),
+                                                self.timeline_row, width=60, bg='white', fg='black',
+                                                selectbackground='#A4D8F2')
+        self._timeline_listbox.pack(padx=10, pady=10)
+        tk.Button(self._timeline_window, text="Перейти", command=self.checkout_selected,
+                  bg='#7FB3D5', activebackground='#5D8BF4', fg='white').pack(pady=(0, 10))
+        self._timeline_listbox.scroll_to(len(self._timeline))
+
+    def timeline_row(self, i):
+        node = self._timeline[i]
+        mark = "▶" if node is self._timeline.current() else " "
+        parent = f" ← #{node._parent._index}" if node._parent is not None else ""
+        return f"{mark} {node.get_info()}{parent}"
+
+    def checkout_selected(self):
+        row = self._timeline_listbox.selected()
+        if row is None:
+            return
+        node = self._timeline.checkout(self._timeline[row])
+        self.after_checkout(f"Перешли к: {node._label}")
+
+    def after_checkout(self, message):
+        if self._save is not None:
+            # журнал знает только движение вперёд, поэтому после перехода пишем снимок заново
+            self.write_save(self._save.save)
+        self.refresh_view()
+        if self._timeline_window is not None:
+            self._timeline_listbox.refresh()
+        self.update_game_over()
+        self.notify("Ветки", message)
+
+    def save_replay(self):
+        path = filedialog.asksaveasfilename(defaultextension='.json',
+                                            filetypes=[("Запись партии", "*.json")])
+        if not path:
+            return
+        try:
+            save_record(path, self._engine)
+        except (OSError, ReplayError) as e:
+            messagebox.showerror("Ошибка", f"Не удалось записать партию: {e}")
+            return
+        self.notify("Запись", f"Seed {self._engine._seed}, действия сохранены в {path}")
+
+    def record(self, label=None, result=None):
+        if self._save is not None:
+            self.write_save(self._save.append, result)
+        if label is not None:
+            self._timeline.commit(label)
+            if self._timeline_window is not None:
+                self._timeline_listbox.refresh()
+
+    def notify(self, title, text):
+        self._event_log.append(title, text)
+        self._event_log.flush()
+
+    def log_day(self, result):
+        for title, text in result._notices:
+            self._event_log.append(title, text)
+        self._event_log.append("Новый день", " | ".join(line for line in result.get_message().splitlines() if line))
+
+        if result._won:
+            self._event_log.append("Победа!", "Вы успешно управляли складом и уничтожили всех вредителей!")
+        if result._lost:
+            self._event_log.append("Проигрыш", "У вас закончились деньги! Игра окончена.")
+
+    def set_actions_state(self, state):
+        for button in self._action_buttons:
+            button.config(state=state)
+
+    def finish_game(self):
+        # окно не закрываем, чтобы ленту событий можно было дочитать
+        self._game_over = True
+        self.set_actions_state('disabled')
+        self.update_hint()
+        self._stop_btn.config(state='disabled')
+        self._undo_btn.config(state='normal')
+        self._timeline_btn.config(state='normal')
+
+    def next_day(self):
+        result = self._engine.next_day()
+        self.record(f"День {result._day}", result)
+
+        self.refresh_view()
+        self.log_day(result)
+        self._event_log.flush()
+
+        if result._won or result._lost:
+            self.finish_game()
+
+    def fast_forward(self):
+        try:
+            self._forward_left = int(self._forward_days.get())
+            self._forward_threshold = float(self._forward_money.get())
+        except (tk.TclError, ValueError):
+            messagebox.showerror("Ошибка", "Укажите число дней и порог денег")
+            return
+
+        self.set_actions_state('disabled')
+        self._stop_btn.config(state='normal')
+        self._forward_job = self._root.after(0, self._forward_batch)
+
+    def stop_fast_forward(self):
+        if self._forward_job is not None:
+            self._root.after_cancel(self._forward_job)
+            self._forward_job = None
+        self._forward_left = 0
+        self._stop_btn.config(state='disabled')
+        if not self._game_over:
+            self.set_actions_state('normal')
+
+    def check_alerts(self, result):
+        if self._engine._money < self._forward_threshold:
+            return f"Деньги ниже {self._forward_threshold:g}₽"
+        if self._stop_on_pest.get() and result._spawned:
+            return f"Появились: {', '.join(p._name for p in result._spawned)}"
+        if self._stop_on_theft.get() and result._stolen:
+            return "Кража со склада"
+        return None
+
+    def _forward_batch(self):
+        self._forward_job = None
+        reason = None
+        result = None
+        for _ in range(min(FAST_FORWARD_BATCH, self._forward_left)):
+            result = self._engine.next_day()
+            self.record(result=result)
+            self._forward_left -= 1
+            self.log_day(result)
+            if result._won or result._lost:
+                break
+            reason = self.check_alerts(result)
+            if reason:
+                break
+
+        if reason:
+            self._event_log.append("Перемотка остановлена", reason)
+        if result is not None:
+            # одна развилка на пачку дней, а не на каждый день
+            self.record(f"Перемотка до дня {result._day}")
+        self.refresh_view()
+        self._event_log.flush()
+
+        if result is not None and (result._won or result._lost):
+            self.finish_game()
+        elif reason or self._forward_left <= 0:
+            self.stop_fast_forward()
+        else:
+            self._forward_job = self._root.after(1, self._forward_batch)
+
+    def buy_poison_menu(self):
+        poison_window = tk.Toplevel(self._root)
+        poison_window.title("Купить средство")
+        poison_window.configure(bg='#B1E0F2')
+
+        tk.Label(poison_window, text="Выберите средство для покупки:",
+                font=('Arial', 12), bg='#B1E0F2').pack(pady=10)
+
+        for poison in self._engine._poisons:
+            frame = tk.Frame(poison_window, bg='#B1E0F2')
+            frame.pack(fill='x', padx=10, pady=5)
+
+            btn_text = f"{poison._name} - {poison._cost}₽\nЭффективность: "
+            btn_text += ", ".join([f"{k} {int(v*100)}%" for k, v in poison._effectiveness.items()])
+
+            tk.Label(frame, text=btn_text, justify='left', bg='#B1E0F2').pack(side='left')
+
+            def buy(p=poison):
+                if self._engine.buy_poison(p):
+                    self.record(f"Куплено: {p._name}")
+                    self.update_info_label()
+                    self.update_inventory_list()
+                    self.notify("Успех", f"Вы купили {p._name}!")
+                    poison_window.destroy()
+                else:
+                    messagebox.showerror("Ошибка", "Недостаточно денег!")
+
+            tk.Button(frame, text="Купить", command=buy,
+                     bg='#7FB3D5', activebackground='#5D8BF4', fg='white').pack(side='right')
+
+    def use_poison_menu(self):
+        if not self._engine.active_pests():
+            self.notify("Информация", "Нет активных вредителей!")
+            return
+
+        owned_poisons = self._engine.owned_poisons()
+        if not owned_poisons:
+            self.notify("Информация", "У вас нет средств для борьбы!")
+            return
+
+        poison_window = tk.Toplevel(self._root)
+        poison_window.title("Использовать средство")
+        poison_window.configure(bg='#B1E0F2')
+
+        tk.Label(poison_window, text="Выберите средство для использования:",
+                font=('Arial', 12), bg='#B1E0F2').pack(pady=10)
+
+        for poison in owned_poisons:
+            frame = tk.Frame(poison_window, bg='#B1E0F2')
+            frame.pack(fill='x', padx=10, pady=5)
+
+            btn_text = f"{poison._name} (осталось: {poison._owned})\nЭффективность: "
+            btn_text += ", ".join([f"{k} {int(v*100)}%" for k, v in poison._effectiveness.items()])
+
+            tk.Label(frame, text=btn_text, justify='left', bg='#B1E0F2').pack(side='left')
+
+            def use(p=poison):
+                killed = self._engine.use_poison(p)
+                self.record(f"Применено: {p._name}")
+
+                if killed:
+                    message = f"Уничтожены: {', '.join(pest._name for pest in killed)}"
+                else:
+                    message = "Ни один вредитель не был уничтожен"
+
+                self.update_info_label()
+                self.update_pests_list()
+                self.update_inventory_list()
+                self.notify("Результат", message)
+                poison_window.destroy()
+
+            tk.Button(frame, text="Использовать", command=use,
+                     bg='#7FB3D5', activebackground='#5D8BF4', fg='white').pack(side='right')
+
+    def repair_resources_menu(self):
+        damaged = self._engine._resources.damaged_count()
+        if not damaged:
+            self.notify("Информация", "Нет поврежденных ресурсов!")
+            return
+
+        total_cost = self._engine.repair_cost(damaged)
+
+        if self._engine._money >= total_cost:
+            self._engine.repair_resources()
+            self.record("Ремонт")
+            self.update_info_label()
+            self.update_resources_list()
+            self.notify("Успех", f"Все ресурсы отремонтированы за {total_cost}₽")
+        else:
+            can_repair = self._engine.affordable_repairs()
+            if can_repair > 0:
+                if messagebox.askyesno("Вопрос", f"У вас недостаточно денег для полного ремонта. Починить {can_repair} из {damaged} за {self._engine.repair_cost(can_repair)}₽?"):
+                    self._engine.repair_resources(can_repair)
+                    self.record(f"Ремонт {can_repair} шт.")
+                    self.update_info_label()
+                    self.update_resources_list()
+                    self.notify("Успех", f"Отремонтировано {can_repair} ресурсов")
+            else:
+                messagebox.showerror("Ошибка", f"Недостаточно денег! Нужно {total_cost}₽")
+
+    def manage_warehouse(self):
+        engine = self._engine
+        manage_window = tk.Toplevel(self._root)
+        manage_window.title("Управление складом")
+        manage_window.configure(bg='#B1E0F2')
+
+        tk.Label(manage_window, text=f"Текущая влажность: {engine._humidity}%",
+                font=('Arial', 12), bg='#B1E0F2').pack(pady=5)
+
+        def reduce_humidity():
+            if engine.reduce_humidity():
+                self.record("Осушение")
+                self.update_info_label()
+                self.notify("Успех", "Влажность уменьшена!")
+                manage_window.destroy()
+            else:
+                messagebox.showerror("Ошибка", "Недостаточно денег!")
+
+        tk.Button(manage_window, text=f"Уменьшить влажность (-{HUMIDITY_REDUCTION}%) - {HUMIDITY_REDUCTION_COST}₽",
+                 command=reduce_humidity, bg='#7FB3D5', activebackground='#5D8BF4', fg='white').pack(pady=5)
+
+        tk.Label(manage_window, text=f"Текущий уровень безопасности: {'★'*engine._security_level}",
+                font=('Arial', 12), bg='#B1E0F2').pack(pady=5)
+
+        if engine._security_level < MAX_SECURITY:
+            def upgrade_security():
+                if engine.upgrade_security():
+                    self.record("Охрана")
+                    self.update_info_label()
+                    self.notify("Успех", "Безопасность улучшена!")
+                    manage_window.destroy()
+                else:
+                    messagebox.showerror("Ошибка", "Недостаточно денег!")
+
+            tk.Button(manage_window,
+                     text=f"Улучшить безопасность (→{'★'*(engine._security_level+1)}) - {engine.security_upgrade_cost()}₽",
+                     command=upgrade_security, bg='#7FB3D5', activebackground='#5D8BF4', fg='white').pack(pady=5)
+        else:
+            tk.Label(manage_window, text="Достигнут максимальный уровень безопасности",
+                    bg='#B1E0F2').pack(pady=5)
+
+
+def main(argv=None):
+    argparse.ArgumentParser(description="Окно игры «Борьба с вредителями на складе»").parse_args(argv)
+    root = tk.Tk()
+    WarehouseGame(root)
+    root.mainloop()
+    return 0
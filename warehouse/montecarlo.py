@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .stock import make_engine
+
+MAX_DAYS = 100
+
+
+class Policy:
+    def act(self, engine):
+        pass
+
+class IdlePolicy(Policy):
+    pass
+
+class PoisonPolicy(Policy):
+    def __init__(self, poison_name="Универсальное средство"):
+        self._poison_name = poison_name
+
+    def act(self, engine):
+        if not engine.active_pests():
+            return
+        poison = engine.get_poison(self._poison_name)
+        if poison._owned <= 0 and not engine.buy_poison(poison):
+            return
+        engine.use_poison(poison)
+
+class RepairPolicy(Policy):
+    def __init__(self, min_money):
+        self._min_money = min_money
+
+    def act(self, engine):
+        if engine._money <= self._min_money or not engine._resources.damaged_count():
+            return
+        spare = int((engine._money - self._min_money) // engine.repair_cost(1))
+        if spare > 0:
+            engine.repair_resources(spare)
+
+class SecurityPolicy(Policy):
+    def __init__(self, day):
+        self._day = day
+
+    def act(self, engine):
+        if engine._day >= self._day:
+            engine.upgrade_security()
+
+class CombinedPolicy(Policy):
+    def __init__(self, *policies):
+        self._policies = policies
+
+    def act(self, engine):
+        for policy in self._policies:
+            policy.act(engine)
+
+
+class GameOutcome:
+    def __init__(self, seed, won, lost, days, money):
+        self._seed = seed
+        self._won = won
+        self._lost = lost
+        self._days = days
+        self._money = money
+
+
+def game_seed(seed, index):
+    # строковый seed хэшируется sha512 и не зависит от PYTHONHASHSEED и номера процесса
+    return f"{seed}:{index}"
+
+def play_game(policy, seed, max_days=MAX_DAYS, quantity=None):
+    engine = make_engine(quantity, seed=seed)
+    for _ in range(max_days):
+        policy.act(engine)
+        result = engine.next_day()
+        if result._lost or result._won:
+            # как в BatchSimulator: долг важнее победы, исходы не пересекаются
+            return GameOutcome(seed, result._won and not result._lost, result._lost, engine._day, engine._money)
+    return GameOutcome(seed, False, False, engine._day, engine._money)
+
+def _play_chunk(policy, seed, indices, max_days, quantity):
+    return [play_game(policy, game_seed(seed, i), max_days, quantity) for i in indices]
+
+def _chunks(count, parts):
+    size = max(1, -(-count // parts))
+    return [range(start, min(count, start + size)) for start in range(0, count, size)]
+
+def run_games(policy, games, seed=0, max_days=MAX_DAYS, workers=None, quantity=None):
+    if games < 1:
+        raise ValueError("нужна хотя бы одна партия")
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or games < 2:
+        return _play_chunk(policy, seed, range(games), max_days, quantity)
+
+    chunks = _chunks(games, workers * 4)
+    outcomes = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_play_chunk, policy, seed, chunk, max_days, quantity) for chunk in chunks]
+        for future in futures:
+            outcomes.extend(future.result())
+    return outcomes
+
+def summarize(outcomes):
+    money = sorted(o._money for o in outcomes)
+    games = len(outcomes)
+    cuts = statistics.quantiles(money, n=20) if games > 1 else money * 19
+    return {
+        'games': games,
+        'win_rate': sum(o._won for o in outcomes) / games,
+        'bankruptcy_rate': sum(o._lost for o in outcomes) / games,
+        'mean_days': statistics.fmean(o._days for o in outcomes),
+        'money': {
+            'mean': statistics.fmean(money),
+            'stdev': statistics.stdev(money) if games > 1 else 0.0,
+            'min': money[0],
+            'p5': cuts[0],
+            'p25': cuts[4],
+            'median': cuts[9],
+            'p75': cuts[14],
+            'p95': cuts[18],
+            'max': money[-1],
+        },
+    }
+
+def evaluate(policy, games=1000, seed=0, max_days=MAX_DAYS, workers=None, quantity=None):
+    return summarize(run_games(policy, games, seed, max_days, workers, quantity))
+
+def compare(policies, games=1000, seed=0, max_days=MAX_DAYS, workers=None, quantity=None):
+    # одинаковые seed'ы для всех стратегий, чтобы сравнение шло на одних и тех же партиях
+    return {name: evaluate(policy, games, seed, max_days, workers, quantity) for name, policy in policies.items()}
+
+
+POLICIES = {
+    'idle': lambda args: IdlePolicy(),
+    'poison': lambda args: PoisonPolicy(),
+    'repair': lambda args: RepairPolicy(args.repair_min),
+    'security': lambda args: SecurityPolicy(args.security_day),
+    'combined': lambda args: CombinedPolicy(PoisonPolicy(), RepairPolicy(args.repair_min),
+                                            SecurityPolicy(args.security_day)),
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Прогон множества партий без интерфейса и сводка по стратегиям")
+    parser.add_argument('--policy', action='append', choices=sorted(POLICIES),
+                        help="стратегия (можно несколько — сравнение на одних и тех же партиях)")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--seed', default=0)
+    parser.add_argument('--days', type=int, default=MAX_DAYS, help="предел длины партии")
+    parser.add_argument('--workers', type=int, help="число процессов (по умолчанию — все ядра)")
+    parser.add_argument('--quantity', type=int,
+                        help="единиц в каждой строке склада (StockWarehouseEngine); по умолчанию — поштучный склад")
+    parser.add_argument('--repair-min', type=float, default=200, help="запас денег, который не тратится на ремонт")
+    parser.add_argument('--security-day', type=int, default=5, help="с какого дня улучшать охрану")
+    args = parser.parse_args(argv)
+    if args.games < 1:
+        parser.error("--games должно быть не меньше 1")
+    if args.quantity is not None and args.quantity < 1:
+        parser.error("--quantity должно быть не меньше 1")
+
+    names = args.policy or ['combined']
+    policies = {name: POLICIES[name](args) for name in names}
+    summary = compare(policies, args.games, args.seed, args.days, args.workers, args.quantity)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
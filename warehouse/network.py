@@ -0,0 +1,265 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from time import perf_counter
+
+from .catalog import load_catalog
+from .engine import WarehouseEngine, START_MONEY
+from .montecarlo import Policy, game_seed
+
+PEST = 'pest'
+FLOOD = 'flood'
+
+
+class NetworkError(ValueError):
+    pass
+
+
+def ring_graph(sites, chance, reach=1):
+    # каждый склад связан с reach соседями с каждой стороны
+    graph = {site: [] for site in range(sites)}
+    for site in range(sites):
+        linked = {site}
+        for step in range(1, reach + 1):
+            # на малых кольцах соседи справа и слева совпадают: ребро одно (у двух складов — 0–1)
+            for neighbour in ((site + step) % sites, (site - step) % sites):
+                if neighbour not in linked:
+                    linked.add(neighbour)
+                    graph[site].append((neighbour, chance))
+    return graph
+
+def grid_graph(width, height, chance):
+    graph = {site: [] for site in range(width * height)}
+    for y in range(height):
+        for x in range(width):
+            site = y * width + x
+            if x + 1 < width:
+                graph[site].append((site + 1, chance))
+                graph[site + 1].append((site, chance))
+            if y + 1 < height:
+                graph[site].append((site + width, chance))
+                graph[site + width].append((site, chance))
+    return graph
+
+def load_graph(path):
+    # {"sites": N, "edges": [[a, b, шанс], ...]}; рёбра неориентированные
+    with open(path, encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise NetworkError(f"{path}: {e}") from None
+    sites = data.get('sites')
+    if not isinstance(sites, int) or sites < 1:
+        raise NetworkError(f"{path}: 'sites' должно быть положительным целым")
+    graph = {site: [] for site in range(sites)}
+    for i, edge in enumerate(data.get('edges', [])):
+        try:
+            a, b, chance = edge
+        except (TypeError, ValueError):
+            raise NetworkError(f"{path}, ребро {i + 1}: ожидалось [a, b, шанс]") from None
+        if not all(isinstance(v, int) and not isinstance(v, bool) for v in (a, b)):
+            raise NetworkError(f"{path}, ребро {i + 1}: номера складов должны быть целыми")
+        if isinstance(chance, bool) or not isinstance(chance, (int, float)):
+            raise NetworkError(f"{path}, ребро {i + 1}: шанс должен быть числом")
+        if a not in graph or b not in graph or not 0 <= chance <= 1:
+            raise NetworkError(f"{path}, ребро {i + 1}: неверный склад или шанс")
+        graph[a].append((b, chance))
+        graph[b].append((a, chance))
+    return graph
+
+
+class SiteReport:
+    def __init__(self, site, money_change, active_pests, damaged, events):
+        self._site = site
+        self._money_change = money_change
+        self._active_pests = active_pests
+        self._damaged = damaged
+        self._events = events
+
+
+class Partition:
+    # склады одного процесса; сообщения друг другу внутри партиции не покидают процесс
+    def __init__(self, sites, graph, seed, policy=None, catalog_dir=None):
+        catalog = load_catalog(catalog_dir) if catalog_dir else None
+        self._engines = {site: WarehouseEngine(catalog=catalog, seed=game_seed(seed, site)) for site in sites}
+        self._edges = {site: graph[site] for site in sites}
+        self._policy = policy or Policy()
+        self._pending = []
+
+    def step(self, pool, incoming):
+        # сообщения с прошлой границы дня применяются в одном порядке при любом разбиении
+        messages = sorted(self._pending + incoming)
+        self._pending = []
+        for target, source, kind, payload in messages:
+            engine = self._engines[target]
+            if kind == PEST:
+                engine._pests[payload]._active = True
+            else:
+                engine.flood_damage(payload)
+
+        reports = []
+        outgoing = []
+        for site, engine in self._engines.items():
+            # все склады дня видят общий баланс на начало дня
+            engine._money = pool
+            self._policy.act(engine)
+            result = engine.next_day()
+            floods = [event for event in result._events if event._kind == FLOOD]
+            rng = engine._rng
+            for neighbour, chance in self._edges[site]:
+                for index, pest in enumerate(engine._pests):
+                    if pest._active and rng.random() < chance:
+                        outgoing.append((neighbour, site, PEST, index))
+                for event in floods:
+                    if rng.random() < chance:
+                        outgoing.append((neighbour, site, FLOOD, event._params.get('pest')))
+            reports.append(SiteReport(site, engine._money - pool, len(engine.active_pests()),
+                                      engine._resources.damaged_count(), [e._name for e in result._events]))
+
+        foreign = []
+        for message in outgoing:
+            (self._pending if message[0] in self._engines else foreign).append(message)
+        return reports, foreign
+
+
+def _serve(connection, sites, graph, seed, policy, catalog_dir):
+    partition = Partition(sites, graph, seed, policy, catalog_dir)
+    while True:
+        command = connection.recv()
+        if command is None:
+            break
+        connection.send(partition.step(*command))
+    connection.close()
+
+
+class NetworkDay:
+    def __init__(self, day, pool, reports, crossing):
+        self._day = day
+        self._pool = pool
+        self._infected = sum(1 for r in reports if r._active_pests)
+        self._active_pests = sum(r._active_pests for r in reports)
+        self._damaged = sum(r._damaged for r in reports)
+        self._events = sum(len(r._events) for r in reports)
+        # сообщения, пересёкшие границу процессов
+        self._crossing = crossing
+        self._lost = pool < 0
+
+    def get_info(self):
+        return (f"День {self._day}: касса {self._pool:.0f}₽, заражено складов {self._infected}, "
+                f"вредителей {self._active_pests}, повреждено {self._damaged}, событий {self._events}, "
+                f"сообщений между процессами {self._crossing}")
+
+
+class WarehouseNetwork:
+    def __init__(self, graph, seed=0, workers=None, policy=None, catalog_dir=None, money=None):
+        self._graph = graph
+        self._sites = len(graph)
+        self._pool = START_MONEY * self._sites if money is None else money
+        self._day = 0
+        workers = max(1, min(workers or os.cpu_count() or 1, self._sites))
+        # соседние номера — в одном процессе: у кольца и решётки почти все рёбра остаются внутри
+        size = -(-self._sites // workers)
+        self._blocks = [range(start, min(self._sites, start + size)) for start in range(0, self._sites, size)]
+        self._owner = {site: i for i, block in enumerate(self._blocks) for site in block}
+        self._inboxes = [[] for _ in self._blocks]
+        self._partition = None
+        self._processes = []
+        self._connections = []
+        if len(self._blocks) == 1:
+            self._partition = Partition(self._blocks[0], graph, seed, policy, catalog_dir)
+            return
+        for block in self._blocks:
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_serve, daemon=True,
+                                              args=(child, list(block), {site: graph[site] for site in block},
+                                                    seed, policy, catalog_dir))
+            process.start()
+            child.close()
+            self._processes.append(process)
+            self._connections.append(parent)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections = []
+        self._processes = []
+
+    def step(self):
+        inboxes = self._inboxes
+        self._inboxes = [[] for _ in self._blocks]
+        if self._partition is not None:
+            answers = [self._partition.step(self._pool, inboxes[0])]
+        else:
+            for connection, inbox in zip(self._connections, inboxes):
+                connection.send((self._pool, inbox))
+            answers = [connection.recv() for connection in self._connections]
+
+        reports = []
+        crossing = 0
+        for block_reports, foreign in answers:
+            reports.extend(block_reports)
+            crossing += len(foreign)
+            for message in foreign:
+                self._inboxes[self._owner[message[0]]].append(message)
+        self._pool += sum(r._money_change for r in reports)
+        self._day += 1
+        return NetworkDay(self._day, self._pool, reports, crossing)
+
+    def run(self, days, stop_on_loss=True):
+        history = []
+        for _ in range(days):
+            day = self.step()
+            history.append(day)
+            if day._lost and stop_on_loss:
+                break
+        return history
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сеть складов с общей кассой и распространением вредителей")
+    parser.add_argument('--sites', type=int, default=100, help="число складов (для кольца)")
+    parser.add_argument('--grid', help="решётка ШxВ вместо кольца, например 10x20")
+    parser.add_argument('--graph', help="граф из JSON: {\"sites\": N, \"edges\": [[a, b, шанс], ...]}")
+    parser.add_argument('--spread', type=float, default=0.05, help="шанс перехода вредителя к соседу за день")
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--seed', default=0)
+    parser.add_argument('--workers', type=int, help="число процессов (по умолчанию — все ядра)")
+    parser.add_argument('--catalog', help="каталог с данными игры вместо встроенного")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.graph:
+            graph = load_graph(args.graph)
+        elif args.grid:
+            width, _, height = args.grid.partition('x')
+            graph = grid_graph(int(width), int(height), args.spread)
+        else:
+            graph = ring_graph(args.sites, args.spread)
+    except (OSError, ValueError) as e:
+        print(f"ОШИБКА: {e}")
+        return 1
+
+    started = perf_counter()
+    with WarehouseNetwork(graph, args.seed, args.workers, catalog_dir=args.catalog) as network:
+        for day in network.run(args.days):
+            print(day.get_info())
+    print(f"{len(graph)} складов, {len(network._blocks)} процессов, {perf_counter() - started:.2f} с")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
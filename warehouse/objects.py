@@ -0,0 +1,96 @@
+import random
+
+
+class GameObject:
+    def __init__(self, name):
+        self._name = name
+
+class Resource(GameObject):
+    def __init__(self, name, resource_type, value, humidity_sensitive=False, food=False):
+        super().__init__(name)
+        self._type = resource_type
+        self._value = value
+        self._damaged = False
+        self._humidity_sensitive = humidity_sensitive
+        self._food = food
+
+    def get_info(self):
+        status = "+" if not self._damaged else "-"
+        return f"{status} {self._name} ({self._type}) - {self._value}₽"
+
+def compile_spawn_predicate(conditions):
+    # условия разбираются один раз; в день остаются только сравнения
+    required = tuple(conditions['required_resources']) if 'required_resources' in conditions else None
+    min_damaged = conditions.get('damaged_resources')
+    min_day = conditions.get('min_day')
+    min_humidity = conditions.get('humidity')
+
+    def predicate(warehouse):
+        if min_day is not None and warehouse._day < min_day:
+            return False
+        if min_humidity is not None and warehouse._humidity < min_humidity:
+            return False
+        if min_damaged is not None and warehouse._resources.damaged_count() < min_damaged:
+            return False
+        if required is not None:
+            has_type = warehouse._resources.has_type
+            for resource_type in required:
+                if has_type(resource_type):
+                    return True
+            return False
+        return True
+
+    return predicate
+
+class Pest(GameObject):
+    def __init__(self, name, damage_chance, spawn_conditions, affected_types, spawn_predicate=None):
+        super().__init__(name)
+        self._damage_chance = damage_chance
+        self._spawn_conditions = spawn_conditions
+        self._affected_types = affected_types
+        self._spawn_predicate = spawn_predicate or compile_spawn_predicate(spawn_conditions)
+        self._index = None
+        self._active = False
+
+    def check_spawn_conditions(self, warehouse):
+        return self._spawn_predicate(warehouse)
+
+    def try_damage(self, resource, rng=random):
+        if resource._type in self._affected_types and not resource._damaged and self._active:
+            if rng.random() < self._damage_chance:
+                resource._damaged = True
+                return True
+        return False
+
+class Poison(GameObject):
+    def __init__(self, name, effectiveness, cost, kill_chances=None):
+        super().__init__(name)
+        self._effectiveness = effectiveness
+        self._cost = cost
+        self._kill_chances = kill_chances
+        self._owned = 0
+
+    def try_kill(self, pest, rng=random):
+        if self._owned <= 0:
+            return False
+
+        if self._kill_chances is not None and pest._index is not None:
+            kill_chance = self._kill_chances[pest._index]
+        else:
+            kill_chance = self._effectiveness.get(pest._name, 0.0)
+        success = rng.random() < kill_chance
+        if success:
+            self._owned -= 1
+        return success
+
+class RandomEvent(GameObject):
+    def __init__(self, name, description, probability, effect, kind=None, params=None):
+        super().__init__(name)
+        self._description = description
+        self._probability = probability
+        self._effect = effect
+        self._kind = kind
+        self._params = params or {}
+
+    def check_event(self, warehouse):
+        return warehouse._rng.random() < self._probability
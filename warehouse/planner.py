@@ -0,0 +1,425 @@
+import argparse
+import os
+import sys
+from math import comb
+from time import perf_counter
+
+import numpy as np
+
+from .catalog import default_catalog, load_catalog
+from .engine import (
+    MAX_SECURITY, MIN_HUMIDITY, MAX_HUMIDITY, HUMIDITY_DRIFT, SPAWN_CHANCE, REPAIR_COST,
+    HUMIDITY_REDUCTION, HUMIDITY_REDUCTION_COST, SECURITY_UPGRADE_COST, WIN_DAY, THEFT_SUCCESS,
+    THEFT_FINE, FIRE_DAMAGE_CHANCE, FIRE_KILL_CHANCE, FLOOD_HUMIDITY, FLOOD_DAMAGE_CHANCE,
+    FLOOD_MOULD_CHANCE,
+)
+
+MODEL_VERSION = 2
+# деньги внутри дня могут уйти в минус и вернуться арендой, поэтому сетка начинается ниже нуля
+MONEY_MIN = -500
+MONEY_MAX = 3000
+MONEY_STEP = 50
+HUMIDITY_BAND = 10
+MAX_PESTS = 8
+DISCOUNT = 0.99
+TOLERANCE = 1e-4
+MAX_SWEEPS = 3000
+# действие дороже «подождать» выбирается, только если выигрыш заметнее шума округления
+ACTION_EPSILON = 1e-9
+CACHE_ENV = 'WAREHOUSE_CACHE'
+
+WAIT = 'wait'
+REPAIR = 'repair'
+HUMIDITY = 'humidity'
+SECURITY = 'security'
+POISON = 'poison:'
+
+
+class PlannerError(ValueError):
+    pass
+
+
+def cache_dir():
+    return os.environ.get(CACHE_ENV) or os.path.join(os.path.expanduser('~'), '.cache', 'warehouse')
+
+def _binomial_rows(size, chance):
+    # rows[d, d'] — вероятность перейти от d повреждённых к d' при Binomial(size - d, chance) новых
+    rows = np.zeros((size + 1, size + 1))
+    for d in range(size + 1):
+        healthy = size - d
+        for k in range(healthy + 1):
+            rows[d, d + k] = comb(healthy, k) * chance ** k * (1 - chance) ** (healthy - k)
+    return rows
+
+def _along_h(values, rows):
+    return np.moveaxis(np.tensordot(values, rows, axes=([1], [1])), -1, 1)
+
+def _along_k(values, rows):
+    return np.moveaxis(np.tensordot(values, rows, axes=([3], [1])), -1, 3)
+
+def _along_d(values, rows):
+    return values @ rows.T
+
+def _kill_rows(pests, chance):
+    # каждый активный вредитель независимо погибает с вероятностью chance
+    masks = 1 << pests
+    rows = np.zeros((masks, masks))
+    for k in range(masks):
+        active = [bit for bit in range(pests) if k >> bit & 1]
+        for killed in range(1 << len(active)):
+            p = 1.0
+            left = k
+            for i, bit in enumerate(active):
+                if killed >> i & 1:
+                    p *= chance
+                    left &= ~(1 << bit)
+                else:
+                    p *= 1 - chance
+            rows[k, left] += p
+    return rows
+
+
+class Planner:
+    # MDP: деньги × полоса влажности × охрана × набор вредителей × число повреждённых.
+    # Склад сведён к средней вещи: повреждения размазаны по типам пропорционально,
+    # украденные вещи уменьшают только деньги (штраф), а не будущую аренду; наличие типов из
+    # required_resources считается постоянным — кража не убирает тип со склада целиком.
+    # Политика выбирается по дисконтированной ценности, а подсказка показывает её шанс победы без дисконта.
+    def __init__(self, catalog=None):
+        self._catalog = catalog if catalog is not None else default_catalog()
+        catalog = self._catalog
+        pests = catalog._pests
+        if len(pests) > MAX_PESTS:
+            raise PlannerError(f"планировщик рассчитан не более чем на {MAX_PESTS} вредителей")
+
+        self._pest_names = [p['name'] for p in pests]
+        self._poison_names = [p['name'] for p in catalog._poisons]
+        self._poison_costs = [p['cost'] for p in catalog._poisons]
+        self._actions = [WAIT] + [POISON + name for name in self._poison_names] + [REPAIR, HUMIDITY, SECURITY]
+
+        resources = catalog._resources
+        self._items = max(1, len(resources))
+        self._mean_value = sum(r['value'] for r in resources) / self._items
+        self._sensitive_share = sum(r['humidity_sensitive'] for r in resources) / self._items
+
+        self._money = np.arange(MONEY_MIN, MONEY_MAX + MONEY_STEP, MONEY_STEP, dtype=float)
+        self._decision = self._money >= 0
+        self._bands = [range(low, low + HUMIDITY_BAND) for low in range(MIN_HUMIDITY, MAX_HUMIDITY, HUMIDITY_BAND)]
+        self._bands.append(range(MAX_HUMIDITY, 101))
+        self._shape = (len(self._money), len(self._bands), MAX_SECURITY, 1 << len(pests), self._items + 1)
+        self._shifts = {}
+
+        self._drift = self._band_rows(lambda h: [max(MIN_HUMIDITY, min(MAX_HUMIDITY, h + u))
+                                                 for u in range(-HUMIDITY_DRIFT, HUMIDITY_DRIFT + 1)])
+        self._flood = self._band_rows(lambda h: [min(100, h + FLOOD_HUMIDITY)])
+        self._dry = self._band_rows(lambda h: [max(MIN_HUMIDITY, h - HUMIDITY_REDUCTION)])
+
+        # по маске вредителей: (K, D, D), уже транспонировано под matmul
+        damage = np.stack([_binomial_rows(self._items, self._hit_chance(k)) for k in range(1 << len(pests))])
+        self._damage = damage.transpose(0, 2, 1).copy()
+        self._fire_damage = _binomial_rows(self._items, FIRE_DAMAGE_CHANCE)
+        self._fire_kill = _kill_rows(len(pests), FIRE_KILL_CHANCE)
+        self._flood_damage = _binomial_rows(self._items, FLOOD_DAMAGE_CHANCE * self._sensitive_share)
+        self._poison_rows = [self._poison_kill_rows(i) for i in range(len(self._poison_names))]
+
+        security = np.arange(1, MAX_SECURITY + 1)
+        self._spawn_base = np.where(security > 1, SPAWN_CHANCE / security, SPAWN_CHANCE)
+        self._theft_success = np.minimum(1.0, THEFT_SUCCESS / security)
+        self._stationary_day = max([WIN_DAY] + [p.get('min_day', 0) - 1 for p in pests])
+
+        types = {r['type'] for r in catalog._resources}
+        self._can_appear = [p.get('required_resources') is None or any(t in types for t in p['required_resources'])
+                            for p in pests]
+
+        self._policy = None
+        self._value = None
+        self._win = None
+
+    def _band_of(self, humidity):
+        return min(len(self._bands) - 1, (humidity - MIN_HUMIDITY) // HUMIDITY_BAND)
+
+    def _band_rows(self, outcomes):
+        # влажность внутри полосы считаем равномерной
+        rows = np.zeros((len(self._bands), len(self._bands)))
+        for b, band in enumerate(self._bands):
+            for h in band:
+                targets = outcomes(h)
+                for target in targets:
+                    rows[b, self._band_of(target)] += 1 / (len(band) * len(targets))
+        return rows
+
+    def _hit_chance(self, mask):
+        pests = self._catalog._pests
+        chances = []
+        for r in self._catalog._resources:
+            survive = 1.0
+            for bit, pest in enumerate(pests):
+                if mask >> bit & 1 and r['type'] in pest['affected_types']:
+                    survive *= 1 - pest['damage_chance']
+            chances.append(1 - survive)
+        return sum(chances) / self._items if chances else 0.0
+
+    def _poison_kill_rows(self, index):
+        # одна купленная единица тратится на первого убитого вредителя
+        chances = self._catalog._effectiveness[index]
+        masks = 1 << len(chances)
+        rows = np.zeros((masks, masks))
+        for k in range(masks):
+            missed = 1.0
+            for bit, chance in enumerate(chances):
+                if k >> bit & 1:
+                    rows[k, k & ~(1 << bit)] += missed * chance
+                    missed *= 1 - chance
+            rows[k, k] += missed
+        return rows
+
+    def _at(self, values, money):
+        # values в произвольных точках money (по оси денег)
+        position = (np.clip(money, MONEY_MIN, MONEY_MAX) - MONEY_MIN) / MONEY_STEP
+        low = np.minimum(np.floor(position).astype(int), len(self._money) - 2)
+        weight = (position - low).reshape((-1,) + (1,) * (values.ndim - 1))
+        return values[low] * (1 - weight) + values[low + 1] * weight
+
+    def _shift(self, values, delta):
+        # values(деньги + delta) с линейной интерполяцией по сетке
+        return self._mix(values, ((delta, 1.0),))
+
+    def _mix(self, values, shifts):
+        # сумма weight * values(деньги + delta): одна матрица по оси денег
+        matrix = self._shifts.get(shifts)
+        if matrix is None:
+            size = len(self._money)
+            matrix = np.zeros((size, size))
+            rows = np.arange(size)
+            for delta, weight in shifts:
+                position = (np.clip(self._money + delta, MONEY_MIN, MONEY_MAX) - MONEY_MIN) / MONEY_STEP
+                low = np.minimum(np.floor(position).astype(int), size - 2)
+                np.add.at(matrix, (rows, low), weight * (1 - (position - low)))
+                np.add.at(matrix, (rows, low + 1), weight * (position - low))
+            self._shifts[shifts] = matrix
+        return (matrix @ values.reshape(len(matrix), -1)).reshape(values.shape)
+
+    def _spread(self, values, low, high, sign):
+        # равномерная сумма min..max по трём точкам
+        middle = (low + high) / 2
+        return self._mix(values, ((sign * low, 0.25), (sign * middle, 0.5), (sign * high, 0.25)))
+
+    def _event(self, values, event):
+        kind = event['effect']
+        if kind == 'income':
+            fired = self._spread(values, event['min'], event['max'], 1)
+        elif kind == 'fine':
+            fired = self._spread(values, event['min'], event['max'], -1)
+        elif kind == 'steal':
+            counts = range(event['min'], event['max'] + 1)
+            stolen = self._mix(values, tuple((-THEFT_FINE * c * self._mean_value, 1 / len(counts)) for c in counts))
+            success = self._theft_success[None, None, :, None, None]
+            fired = values * (1 - success) + stolen * success
+        elif kind == 'fire':
+            fired = _along_k(_along_d(values, self._fire_damage), self._fire_kill)
+        else:
+            fired = _along_h(_along_d(values, self._flood_damage), self._flood)
+            if event.get('pest') in self._pest_names:
+                fired = self._spawn_one(fired, self._pest_names.index(event['pest']), FLOOD_MOULD_CHANCE)
+        return values * (1 - event['probability']) + fired * event['probability']
+
+    def _spawn_one(self, values, bit, chance):
+        masks = np.arange(self._shape[3])
+        without = masks[(masks >> bit & 1) == 0]
+        result = values.copy()
+        result[:, :, :, without] = (values[:, :, :, without] * (1 - chance)
+                                    + values[:, :, :, without | (1 << bit)] * chance)
+        return result
+
+    def _spawn(self, values, day):
+        damaged = np.arange(self._shape[4])
+        for bit, pest in enumerate(self._catalog._pests):
+            if pest.get('min_day', 0) > day or not self._can_appear[bit]:
+                continue
+            threshold = pest.get('humidity')
+            in_band = np.array([1.0 if threshold is None else sum(h >= threshold for h in band) / len(band)
+                                for band in self._bands])
+            enough = (damaged >= pest.get('damaged_resources', 0)).astype(float)
+            chance = in_band[:, None, None] * self._spawn_base[None, :, None] * enough[None, None, :]
+            values = self._spawn_one(values, bit, chance[None, :, :, None, :])
+        return values
+
+    def expect_day(self, following, day, discount=DISCOUNT):
+        # ожидание по следующему дню в обратном порядке шагов next_day; day — номер наступающего дня
+        end = following * discount
+        if day > WIN_DAY:
+            end[:, :, :, 0] = 1.0
+        end[~self._decision] = 0.0
+
+        values = np.empty_like(end)
+        for d in range(self._shape[4]):
+            rent = (self._items - d) * self._mean_value * 0.1
+            values[..., d] = self._shift(end[..., d], rent)
+        for event in reversed(self._catalog._events):
+            values = self._event(values, event)
+        values = (values[..., None, :] @ self._damage)[..., 0, :]
+        values = self._spawn(values, day)
+        return _along_h(values, self._drift)
+
+    def action_values(self, expected):
+        money = self._money[:, None, None, None, None]
+        actions = [expected]
+        for cost, rows in zip(self._poison_costs, self._poison_rows):
+            q = _along_k(self._shift(expected, -cost), rows)
+            q[:, :, :, 0] = -1.0
+            actions.append(np.where(money >= cost, q, -1.0))
+
+        repair = np.full(self._shape, -1.0)
+        # чинится столько, сколько хватает денег, как в меню ремонта
+        affordable = np.maximum(self._money, 0) // REPAIR_COST
+        for d in range(1, self._shape[4]):
+            counts = np.minimum(d, affordable).astype(int)
+            for count in np.unique(counts[counts > 0]):
+                rows = counts == count
+                repair[rows, ..., d] = self._at(expected[..., d - count], self._money[rows] - count * REPAIR_COST)
+        actions.append(repair)
+
+        dry = _along_h(self._shift(expected, -HUMIDITY_REDUCTION_COST), self._dry)
+        actions.append(np.where(money >= HUMIDITY_REDUCTION_COST, dry, -1.0))
+
+        security = np.full(self._shape, -1.0)
+        for s in range(MAX_SECURITY - 1):
+            cost = SECURITY_UPGRADE_COST * (s + 1)
+            upgraded = self._shift(expected[:, :, s + 1], -cost)
+            security[:, :, s] = np.where(self._money[:, None, None, None] >= cost, upgraded, -1.0)
+        actions.append(security)
+
+        q = np.stack(actions)
+        q[1:] -= ACTION_EPSILON
+        return q
+
+    def _decide(self, following, day):
+        q = self.action_values(self.expect_day(following, day))
+        value = q.max(axis=0)
+        value[~self._decision] = 0.0
+        return value, q.argmax(axis=0).astype(np.int8)
+
+    def _follow(self, following, day, policy):
+        # шанс победы при заданной политике: то же ожидание, но без дисконта
+        q = self.action_values(self.expect_day(following, day, discount=1.0))
+        value = np.take_along_axis(q, policy[None].astype(np.intp), axis=0)[0]
+        value[~self._decision] = 0.0
+        return value
+
+    def _converge(self, step, log, name):
+        value = np.zeros(self._shape)
+        for sweep in range(MAX_SWEEPS):
+            updated = step(value)
+            change = np.abs(updated - value).max()
+            value = updated
+            if change < TOLERANCE:
+                break
+        if log:
+            log(f"{name}: {sweep + 1} итераций, изменение {change:.2e}")
+        return value
+
+    def solve(self, log=None):
+        day = self._stationary_day + 1
+        value = self._converge(lambda v: self._decide(v, day)[0], log, "стационарная часть")
+        _, policy = self._decide(value, day)
+        win = self._converge(lambda w: self._follow(w, day, policy), log, "шанс победы")
+
+        values, policies, wins = [value], [policy], [win]
+        for day in range(self._stationary_day - 1, -1, -1):
+            value, policy = self._decide(value, day + 1)
+            win = self._follow(win, day + 1, policy)
+            values.append(value)
+            policies.append(policy)
+            wins.append(win)
+        self._value = np.stack(values[::-1])[:, self._decision].astype(np.float32)
+        self._win = np.stack(wins[::-1])[:, self._decision].astype(np.float32)
+        self._policy = np.stack(policies[::-1])[:, self._decision]
+
+    def cache_path(self, directory=None):
+        digest = self._catalog.digest()[:16]
+        return os.path.join(directory or cache_dir(), f"policy-{digest}-v{MODEL_VERSION}.npz")
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = path + '.tmp.npz'
+        np.savez_compressed(temp, policy=self._policy, value=self._value, win=self._win,
+                            actions=np.array(self._actions), digest=np.array(self._catalog.digest()))
+        os.replace(temp, path)
+
+    def load(self, path):
+        with np.load(path) as data:
+            if str(data['digest']) != self._catalog.digest() or list(data['actions']) != self._actions:
+                raise PlannerError(f"{path}: таблица посчитана для другого каталога")
+            self._policy = data['policy']
+            self._value = data['value']
+            self._win = data['win']
+
+    def _state(self, engine):
+        m = int(round(min(max(engine._money, 0), MONEY_MAX) / MONEY_STEP))
+        h = self._band_of(max(MIN_HUMIDITY, engine._humidity))
+        s = min(MAX_SECURITY, engine._security_level) - 1
+        active = {p._name for p in engine._pests if p._active}
+        k = sum(1 << bit for bit, name in enumerate(self._pest_names) if name in active)
+        # доля повреждённых единиц: у StockLedger строк меньше, чем единиц товара
+        store = engine._resources
+        damaged = store.damaged_count()
+        stored = max(1, store.healthy_count() + damaged)
+        d = min(self._items, round(damaged * self._items / stored))
+        return min(engine._day, self._stationary_day), m, h, s, k, d
+
+    def recommend(self, engine):
+        # (действие, шанс победы, если и дальше следовать советам) — поиск в готовой таблице
+        state = self._state(engine)
+        return self._actions[self._policy[state]], float(self._win[state])
+
+
+def describe(action):
+    if action == WAIT:
+        return "перейти к следующему дню"
+    if action == REPAIR:
+        return "починить ресурсы"
+    if action == HUMIDITY:
+        return "уменьшить влажность"
+    if action == SECURITY:
+        return "улучшить охрану"
+    return f"купить и применить «{action[len(POISON):]}»"
+
+def load_planner(catalog=None, directory=None, log=None):
+    # таблица берётся из кэша по отпечатку каталога; если её нет — считается и сохраняется
+    planner = Planner(catalog)
+    path = planner.cache_path(directory)
+    if os.path.exists(path):
+        try:
+            planner.load(path)
+            return planner
+        except (OSError, ValueError, KeyError):
+            pass
+    planner.solve(log)
+    try:
+        planner.save(path)
+    except OSError:
+        pass
+    return planner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Расчёт таблицы рекомендаций (value iteration)")
+    parser.add_argument('--catalog', help="каталог с данными игры вместо встроенного")
+    parser.add_argument('--cache-dir', help=f"куда сохранить таблицу (по умолчанию ${CACHE_ENV} или ~/.cache/warehouse)")
+    parser.add_argument('--force', action='store_true', help="пересчитать, даже если таблица уже есть")
+    args = parser.parse_args(argv)
+
+    planner = Planner(load_catalog(args.catalog) if args.catalog else None)
+    path = planner.cache_path(args.cache_dir)
+    if os.path.exists(path) and not args.force:
+        print(f"таблица уже посчитана: {path}")
+        return 0
+    started = perf_counter()
+    planner.solve(log=print)
+    planner.save(path)
+    print(f"готово за {perf_counter() - started:.1f} с: {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import argparse
+import hashlib
+import json
+import sys
+from time import perf_counter
+
+from .catalog import CatalogError, default_catalog, load_catalog
+from .engine import WarehouseEngine
+from .fast import FastWarehouseEngine
+from .store import ResourceStore
+
+FORMAT = 1
+# класс движка пишется в запись: у быстрого движка другой поток случайных чисел
+ENGINES = {cls.__name__: cls for cls in (WarehouseEngine, FastWarehouseEngine)}
+ACTIONS = ('next_day', 'buy', 'use', 'repair', 'humidity', 'security')
+
+
+class ReplayError(ValueError):
+    pass
+
+
+def resources_digest(store):
+    digest = hashlib.sha256()
+    if isinstance(store, ResourceStore):
+        # колонки целиком: дешевле, чем строка на каждый товар
+        digest.update(json.dumps([store._names, store._types], ensure_ascii=False).encode('utf-8'))
+        for column in (store._name_codes, store._type_codes, store._values, store._flags):
+            digest.update(column)
+    else:
+        for resource in store:
+            digest.update(resource.get_info().encode('utf-8'))
+    return digest.hexdigest()
+
+def state_of(engine):
+    return {
+        'day': engine._day,
+        'money': engine._money,
+        'humidity': engine._humidity,
+        'security': engine._security_level,
+        'active_pests': [p._name for p in engine.active_pests()],
+        'poisons': {p._name: p._owned for p in engine._poisons},
+        'resources': len(engine._resources),
+        'damaged': engine._resources.damaged_count(),
+        'resources_digest': resources_digest(engine._resources),
+    }
+
+
+def engine_name(engine):
+    name = type(engine).__name__
+    if ENGINES.get(name) is not type(engine):
+        raise ReplayError(f"движок {name} не поддерживает повтор")
+    return name
+
+def record_game(engine):
+    if engine._seed is None:
+        raise ReplayError("партия начата с чужим генератором и без seed — повторить её нельзя")
+    if engine._actions is None:
+        raise ReplayError("действия игрока не записывались (track_actions)")
+    return {
+        'format': FORMAT,
+        'seed': engine._seed,
+        'catalog': engine._catalog.digest(),
+        'engine': engine_name(engine),
+        'actions': [list(action) for action in engine._actions],
+        'final': state_of(engine),
+    }
+
+def save_record(path, engine):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(record_game(engine), f, ensure_ascii=False)
+
+def check_record(record, where):
+    if not isinstance(record, dict):
+        raise ReplayError(f"{where}: ожидался объект записи")
+    if record.get('format') != FORMAT:
+        raise ReplayError(f"{where}: неподдерживаемый формат записи {record.get('format')}")
+    for key, kinds in (('seed', (int, str)), ('catalog', str), ('actions', list), ('final', dict)):
+        if not isinstance(record.get(key), kinds) or isinstance(record.get(key), bool):
+            raise ReplayError(f"{where}: нет поля '{key}' или у него неверный тип")
+    if record.get('engine', WarehouseEngine.__name__) not in ENGINES:
+        raise ReplayError(f"{where}: неизвестный движок {record.get('engine')!r}")
+    for i, action in enumerate(record['actions']):
+        if not isinstance(action, list) or len(action) != 2 or action[0] not in ACTIONS:
+            raise ReplayError(f"{where}, действие {i + 1}: ожидалось [действие, аргумент]")
+        name, argument = action
+        if name == 'next_day':
+            valid = isinstance(argument, int) and not isinstance(argument, bool) and argument > 0
+        elif name in ('buy', 'use'):
+            valid = isinstance(argument, str)
+        elif name == 'repair':
+            valid = argument is None or isinstance(argument, int) and not isinstance(argument, bool)
+        else:
+            valid = True
+        if not valid:
+            raise ReplayError(f"{where}, действие {i + 1}: неверный аргумент {argument!r} у '{name}'")
+    return record
+
+def load_record(path):
+    with open(path, encoding='utf-8') as f:
+        try:
+            record = json.load(f)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ReplayError(f"{path}: не запись партии ({e})") from None
+    return check_record(record, path)
+
+
+def replay(record, catalog=None, engine_factory=None):
+    # без явного engine_factory — класс из записи (в старых записях его нет: WarehouseEngine)
+    if engine_factory is None:
+        engine_factory = ENGINES[record.get('engine', WarehouseEngine.__name__)]
+    catalog = catalog if catalog is not None else default_catalog()
+    if record['catalog'] != catalog.digest():
+        raise ReplayError("каталог отличается от того, на котором записана партия")
+
+    engine = engine_factory(catalog=catalog, seed=record['seed'])
+    for action, argument in record['actions']:
+        if action == 'next_day':
+            next_day = engine.next_day
+            for _ in range(argument):
+                next_day()
+        elif action in ('buy', 'use'):
+            try:
+                poison = engine.get_poison(argument)
+            except KeyError:
+                raise ReplayError(f"в каталоге нет средства '{argument}'") from None
+            if action == 'buy':
+                engine.buy_poison(poison)
+            else:
+                engine.use_poison(poison)
+        elif action == 'repair':
+            engine.repair_resources(argument)
+        elif action == 'humidity':
+            engine.reduce_humidity()
+        elif action == 'security':
+            engine.upgrade_security()
+        else:
+            raise ReplayError(f"неизвестное действие '{action}'")
+    return engine
+
+def verify(record, catalog=None, engine_factory=None):
+    # расхождения итогового состояния: {поле: (записано, получено)}
+    final = state_of(replay(record, catalog, engine_factory))
+    return {key: (value, final.get(key)) for key, value in record['final'].items() if final.get(key) != value}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Повтор записанной партии и проверка итогового состояния")
+    parser.add_argument('records', nargs='+', help="файлы записей партий (JSON)")
+    parser.add_argument('--catalog', help="каталог с данными игры вместо встроенного")
+    args = parser.parse_args(argv)
+
+    try:
+        catalog = load_catalog(args.catalog) if args.catalog else None
+    except (OSError, CatalogError) as e:
+        print(f"ОШИБКА: {e}")
+        return 1
+    failed = 0
+    for path in args.records:
+        started = perf_counter()
+        try:
+            mismatches = verify(load_record(path), catalog)
+        except (OSError, ReplayError) as e:
+            print(f"{path}: ОШИБКА {e}")
+            failed += 1
+            continue
+        elapsed = perf_counter() - started
+        if mismatches:
+            failed += 1
+            print(f"{path}: РАСХОЖДЕНИЕ ({elapsed:.2f} с)")
+            for key, (expected, actual) in mismatches.items():
+                print(f"  {key}: записано {expected!r}, получено {actual!r}")
+        else:
+            print(f"{path}: совпадает ({elapsed:.2f} с)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
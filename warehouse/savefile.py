@@ -0,0 +1,430 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from .engine import WarehouseEngine
+from .store import (
+    ResourceStore, _Bucket, DAMAGED, HUMIDITY_SENSITIVE, FOOD, OP_ADD, OP_DAMAGE, OP_REMOVE, OP_REPAIR,
+)
+
+MAGIC = b'WHSAVE'
+JOURNAL_MAGIC = b'WHJRNL'
+VERSION = 2
+JOURNAL_SUFFIX = '.journal'
+# повтор операции журнала в сотни раз дороже чтения того же объёма снимка, поэтому журнал
+# переписывается в новый снимок, как только дорастёт до 1/CHECKPOINT_RATIO его размера
+CHECKPOINT_RATIO = 64
+CHECKPOINT_MIN_BYTES = 64 * 1024
+
+# magic, версия, поколение, день, деньги, влажность, охрана, стоимость целых, стоимость всего
+HEADER = struct.Struct('<6sHQIdiBdd')
+JOURNAL_HEADER = struct.Struct('<6sHQ')
+SECTION = struct.Struct('<Q')
+# длина записи, crc32 содержимого
+RECORD = struct.Struct('<II')
+DAY = struct.Struct('<IdiB')
+COUNT16 = struct.Struct('<H')
+COUNT32 = struct.Struct('<I')
+PEST_CHANGE = struct.Struct('<HB')
+POISON_CHANGE = struct.Struct('<HI')
+OP = struct.Struct('<BI')
+ADDED = struct.Struct('<dB')
+# crc32 всего снимка перед ним
+CHECKSUM = struct.Struct('<I')
+# версия генератора, число слов состояния; после слов — есть ли gauss и он сам
+RNG_STATE = struct.Struct('<BH')
+GAUSS = struct.Struct('<?d')
+
+
+class SaveError(ValueError):
+    pass
+
+
+def _write_section(write, data):
+    write(SECTION.pack(len(memoryview(data).cast('B'))))
+    write(data)
+
+def _section(view, offset):
+    (size,) = SECTION.unpack_from(view, offset)
+    start = offset + SECTION.size
+    if start + size > len(view):
+        raise SaveError("снимок обрезан")
+    return start, start + size
+
+def _read_bytes(view, offset):
+    # копия, а не срез: живые срезы mmap не дают закрыть файл
+    start, end = _section(view, offset)
+    return bytes(view[start:end]), end
+
+def _read_array(typecode, view, offset, swap):
+    start, end = _section(view, offset)
+    column = array(typecode)
+    column.frombytes(view[start:end])
+    if swap:
+        column.byteswap()
+    return column, end
+
+def _pack_text(text):
+    data = text.encode('utf-8')
+    return COUNT16.pack(len(data)) + data
+
+def _pack_rng(rng):
+    if not hasattr(rng, 'getstate'):
+        return RNG_STATE.pack(0, 0)
+    version, internal, gauss = rng.getstate()
+    words = array('I', internal)
+    if sys.byteorder != 'little':
+        words.byteswap()
+    return b''.join((RNG_STATE.pack(version, len(words)), words.tobytes(),
+                     GAUSS.pack(gauss is not None, gauss or 0.0)))
+
+def _unpack_rng(data, offset):
+    version, count = RNG_STATE.unpack_from(data, offset)
+    offset += RNG_STATE.size
+    if not count:
+        return None, offset
+    words = array('I')
+    words.frombytes(data[offset:offset + count * words.itemsize])
+    if len(words) != count:
+        raise SaveError("обрезано состояние генератора")
+    if sys.byteorder != 'little':
+        words.byteswap()
+    offset += count * words.itemsize
+    has_gauss, gauss = GAUSS.unpack_from(data, offset)
+    return (version, tuple(words), gauss if has_gauss else None), offset + GAUSS.size
+
+def _check_store(store):
+    # после crc это ловит уже не порчу, а несогласованный снимок
+    size = len(store._values)
+    columns = (store._name_codes, store._type_codes, store._flags, store._health_positions, store._humidity_positions)
+    if any(len(column) != size for column in columns):
+        raise SaveError("колонки склада разной длины")
+    if len(store._type_counts) != len(store._types) or sum(store._type_counts) != size:
+        raise SaveError("счётчики типов не сходятся со складом")
+    if sum(len(bucket._members) for bucket in store._healthy) + len(store._damaged._members) != size:
+        raise SaveError("корзины целых и повреждённых не покрывают склад")
+    if len(store._humidity._members) != sum(1 for flags in store._flags if flags & HUMIDITY_SENSITIVE):
+        raise SaveError("корзина влажности не сходится с флагами")
+    if size and (max(store._name_codes) >= len(store._names) or max(store._type_codes) >= len(store._types)):
+        raise SaveError("код имени или типа вне словаря")
+
+def _unpack_text(data, offset):
+    (size,) = COUNT16.unpack_from(data, offset)
+    offset += COUNT16.size
+    return bytes(data[offset:offset + size]).decode('utf-8'), offset + size
+
+
+class SaveFile:
+    # снимок склада + журнал дневных изменений рядом с ним (path + '.journal')
+    def __init__(self, path):
+        self._path = path
+        self._journal_path = path + JOURNAL_SUFFIX
+        self._generation = None
+        self._snapshot_size = 0
+        self._journal_size = 0
+        self._pests = b''
+        self._poisons = []
+
+    def save(self, engine):
+        store = engine._resources
+        if not isinstance(store, ResourceStore):
+            raise SaveError("сохранять можно только склад на ResourceStore")
+
+        meta = {
+            'byteorder': sys.byteorder,
+            'names': store._names,
+            'types': store._types,
+            'pests': [p._name for p in engine._pests],
+            'poisons': [p._name for p in engine._poisons],
+            'rng': engine._rng.getstate() if hasattr(engine._rng, 'getstate') else None,
+        }
+        pests = bytes(1 if p._active else 0 for p in engine._pests)
+        poisons = array('I', [p._owned for p in engine._poisons])
+        # случайное поколение связывает журнал со снимком, даже если сбой случился между их записью
+        generation = int.from_bytes(os.urandom(8), 'little')
+
+        temp = self._path + '.tmp'
+        with open(temp, 'wb') as f:
+            crc = 0
+
+            def write(data):
+                nonlocal crc
+                crc = zlib.crc32(data, crc)
+                f.write(data)
+
+            write(HEADER.pack(MAGIC, VERSION, generation, engine._day, engine._money, engine._humidity,
+                                engine._security_level, store._healthy_value, store._total_value))
+            _write_section(write, json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+            for column in (store._name_codes, store._type_codes, store._values, store._flags,
+                           store._health_positions, store._humidity_positions, store._type_counts,
+                           store._damaged._members, store._humidity._members):
+                _write_section(write, column)
+            for bucket in store._healthy:
+                _write_section(write, bucket._members)
+            _write_section(write, pests)
+            _write_section(write, poisons)
+            f.write(CHECKSUM.pack(crc))
+            self._snapshot_size = f.tell()
+        os.replace(temp, self._path)
+
+        # новый снимок уже содержит всё, что было в журнале
+        with open(self._journal_path, 'wb') as f:
+            f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, VERSION, generation))
+        self._journal_size = JOURNAL_HEADER.size
+        self._generation = generation
+        self._remember(engine)
+        store.pop_journal()
+        store.track_journal()
+
+    def _remember(self, engine):
+        self._pests = bytes(1 if p._active else 0 for p in engine._pests)
+        self._poisons = [p._owned for p in engine._poisons]
+
+    def append(self, engine, result=None):
+        # одна запись на день или действие игрока: O(числа изменений) плюс состояние генератора (~2,5 КБ),
+        # чтобы загруженная партия продолжала поток случайных чисел, а не повторяла его со снимка
+        ops = engine._resources.pop_journal()
+        if ops is None:
+            raise SaveError("сначала сохраните снимок склада")
+
+        events = []
+        if result is not None:
+            events = [engine._random_events.index(e) for e in result._events]
+        pests = bytes(1 if p._active else 0 for p in engine._pests)
+        pest_changes = [(i, active) for i, (active, old) in enumerate(zip(pests, self._pests)) if active != old]
+        poison_changes = [(i, p._owned) for i, (p, old) in enumerate(zip(engine._poisons, self._poisons))
+                          if p._owned != old]
+
+        parts = [DAY.pack(engine._day, engine._money, engine._humidity, engine._security_level),
+                 COUNT16.pack(len(events))]
+        parts.extend(COUNT16.pack(i) for i in events)
+        parts.append(COUNT16.pack(len(pest_changes)))
+        parts.extend(PEST_CHANGE.pack(i, active) for i, active in pest_changes)
+        parts.append(COUNT16.pack(len(poison_changes)))
+        parts.extend(POISON_CHANGE.pack(i, owned) for i, owned in poison_changes)
+        parts.append(COUNT32.pack(len(ops)))
+        for op in ops:
+            parts.append(OP.pack(op[0], op[1]))
+            if op[0] == OP_ADD:
+                _, _, name, resource_type, value, flags = op
+                parts.extend((_pack_text(name), _pack_text(resource_type), ADDED.pack(value, flags)))
+        parts.append(_pack_rng(engine._rng))
+        payload = b''.join(parts)
+
+        with open(self._journal_path, 'ab') as f:
+            f.write(RECORD.pack(len(payload), zlib.crc32(payload)))
+            f.write(payload)
+        self._journal_size += RECORD.size + len(payload)
+        self._pests = pests
+        self._poisons = [p._owned for p in engine._poisons]
+
+        if self._journal_size > max(CHECKPOINT_MIN_BYTES, self._snapshot_size // CHECKPOINT_RATIO):
+            self.save(engine)
+
+    def load(self, rng=None, stats=None, catalog=None):
+        engine = WarehouseEngine(rng, stats, catalog)
+        with open(self._path, 'rb') as f:
+            # пустой файл mmap не отображает вовсе
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise SaveError(f"{self._path}: не файл сохранения")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                body = None
+                try:
+                    body = self._checked_body(view)
+                    self._load_snapshot(engine, body, restore_rng=rng is None)
+                except SaveError:
+                    raise
+                except (ValueError, TypeError, KeyError, IndexError, OverflowError, struct.error) as e:
+                    raise SaveError(f"{self._path}: повреждённый снимок ({e})") from None
+                finally:
+                    if body is not None:
+                        body.release()
+                    view.release()
+        try:
+            self._replay_journal(engine, restore_rng=rng is None)
+        except SaveError:
+            raise
+        except (ValueError, TypeError, KeyError, IndexError, struct.error) as e:
+            raise SaveError(f"{self._journal_path}: запись журнала не подходит к снимку ({e})") from None
+        # партия продолжается с середины: с начального seed её уже не повторить
+        engine._seed = None
+        self._remember(engine)
+        engine._resources.track_journal()
+        return engine
+
+    def _checked_body(self, view):
+        # снимок без контрольной суммы в конце; до разбора, чтобы порча не доходила до json и колонок
+        if len(view) < HEADER.size + CHECKSUM.size:
+            raise SaveError(f"{self._path}: не файл сохранения")
+        magic, version = HEADER.unpack_from(view, 0)[:2]
+        if magic != MAGIC:
+            raise SaveError(f"{self._path}: не файл сохранения")
+        if version != VERSION:
+            raise SaveError(f"{self._path}: неподдерживаемая версия {version}")
+        end = len(view) - CHECKSUM.size
+        body = view[:end]
+        if zlib.crc32(body) != CHECKSUM.unpack_from(view, end)[0]:
+            body.release()
+            raise SaveError(f"{self._path}: снимок повреждён (не сходится контрольная сумма)")
+        return body
+
+    def _load_snapshot(self, engine, view, restore_rng):
+        (_, _, generation, day, money, humidity, security,
+         healthy_value, total_value) = HEADER.unpack_from(view, 0)
+
+        data, offset = _read_bytes(view, HEADER.size)
+        meta = json.loads(data.decode('utf-8'))
+        swap = meta['byteorder'] != sys.byteorder
+
+        store = ResourceStore()
+        store._names = meta['names']
+        store._name_lookup = {name: code for code, name in enumerate(store._names)}
+        store._types = meta['types']
+        store._type_lookup = {name: code for code, name in enumerate(store._types)}
+        store._name_codes, offset = _read_array('I', view, offset, swap)
+        store._type_codes, offset = _read_array('H', view, offset, swap)
+        store._values, offset = _read_array('d', view, offset, swap)
+        flags, offset = _read_bytes(view, offset)
+        store._flags = bytearray(flags)
+        store._health_positions, offset = _read_array('I', view, offset, swap)
+        store._humidity_positions, offset = _read_array('I', view, offset, swap)
+        store._type_counts, offset = _read_array('q', view, offset, swap)
+        store._damaged._members, offset = _read_array('I', view, offset, swap)
+        store._humidity._members, offset = _read_array('I', view, offset, swap)
+        for _ in store._types:
+            bucket = _Bucket()
+            bucket._members, offset = _read_array('I', view, offset, swap)
+            store._healthy.append(bucket)
+        store._healthy_value = healthy_value
+        store._total_value = total_value
+        _check_store(store)
+
+        # журнал ссылается на вредителей и средства по номеру, поэтому каталог должен совпадать
+        if [p._name for p in engine._pests] != meta['pests']:
+            raise SaveError(f"{self._path}: вредители в каталоге не совпадают с сохранением")
+        if [p._name for p in engine._poisons] != meta['poisons']:
+            raise SaveError(f"{self._path}: средства в каталоге не совпадают с сохранением")
+        pests, offset = _read_bytes(view, offset)
+        poisons, offset = _read_array('I', view, offset, swap)
+        if offset != len(view) or len(pests) != len(engine._pests) or len(poisons) != len(engine._poisons):
+            raise SaveError(f"{self._path}: снимок не сходится по длине")
+        for pest, active in zip(engine._pests, pests):
+            pest._active = bool(active)
+        for poison, owned in zip(engine._poisons, poisons):
+            poison._owned = owned
+
+        engine._resources = store
+        engine._day = day
+        engine._money = int(money) if money.is_integer() else money
+        engine._humidity = humidity
+        engine._security_level = security
+        if restore_rng and meta['rng'] is not None:
+            version, state, gauss = meta['rng']
+            engine._rng.setstate((version, tuple(state), gauss))
+        self._generation = generation
+        self._snapshot_size = len(view) + CHECKSUM.size
+
+    def _replay_journal(self, engine, restore_rng=True):
+        try:
+            with open(self._journal_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b''
+        if len(data) < JOURNAL_HEADER.size or JOURNAL_HEADER.unpack_from(data, 0) != (JOURNAL_MAGIC, VERSION, self._generation):
+            # журнала нет или он от другого снимка
+            with open(self._journal_path, 'wb') as f:
+                f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, VERSION, self._generation))
+            self._journal_size = JOURNAL_HEADER.size
+            return
+
+        offset = JOURNAL_HEADER.size
+        rng_state = None
+        for payload, offset in _records(data):
+            rng_state = self._apply_record(engine, payload)
+        if restore_rng and rng_state is not None:
+            engine._rng.setstate(rng_state)
+        if offset < len(data):
+            # недописанный хвост после сбоя отрезаем, чтобы новые записи шли за целыми
+            with open(self._journal_path, 'r+b') as f:
+                f.truncate(offset)
+        self._journal_size = offset
+
+    def _apply_record(self, engine, payload):
+        day, money, humidity, security = DAY.unpack_from(payload, 0)
+        offset = DAY.size
+        (count,) = COUNT16.unpack_from(payload, offset)
+        offset += COUNT16.size * (count + 1)
+
+        (count,) = COUNT16.unpack_from(payload, offset)
+        offset += COUNT16.size
+        for _ in range(count):
+            i, active = PEST_CHANGE.unpack_from(payload, offset)
+            engine._pests[i]._active = bool(active)
+            offset += PEST_CHANGE.size
+        (count,) = COUNT16.unpack_from(payload, offset)
+        offset += COUNT16.size
+        for _ in range(count):
+            i, owned = POISON_CHANGE.unpack_from(payload, offset)
+            engine._poisons[i]._owned = owned
+            offset += POISON_CHANGE.size
+
+        store = engine._resources
+        (count,) = COUNT32.unpack_from(payload, offset)
+        offset += COUNT32.size
+        for _ in range(count):
+            code, slot = OP.unpack_from(payload, offset)
+            offset += OP.size
+            if code == OP_DAMAGE:
+                store.set_damaged(slot, True)
+            elif code == OP_REPAIR:
+                store.set_damaged(slot, False)
+            elif code == OP_REMOVE:
+                store.remove_slot(slot)
+            elif code == OP_ADD:
+                name, offset = _unpack_text(payload, offset)
+                resource_type, offset = _unpack_text(payload, offset)
+                value, flags = ADDED.unpack_from(payload, offset)
+                offset += ADDED.size
+                store.add(name, resource_type, int(value) if value.is_integer() else value,
+                          bool(flags & HUMIDITY_SENSITIVE), bool(flags & FOOD), bool(flags & DAMAGED))
+            else:
+                raise SaveError(f"{self._journal_path}: неизвестная операция {code}")
+        rng_state, offset = _unpack_rng(payload, offset)
+
+        engine._day = day
+        engine._money = int(money) if money.is_integer() else money
+        engine._humidity = humidity
+        engine._security_level = security
+        return rng_state
+
+
+def _records(data):
+    # целые записи журнала и смещение за каждой; на битой или недописанной останавливаемся
+    offset = JOURNAL_HEADER.size
+    while offset + RECORD.size <= len(data):
+        size, crc = RECORD.unpack_from(data, offset)
+        payload = data[offset + RECORD.size:offset + RECORD.size + size]
+        if len(payload) < size or zlib.crc32(payload) != crc:
+            return
+        offset += RECORD.size + size
+        yield payload, offset
+
+def read_events(path, engine):
+    # какие события срабатывали по дням после последнего снимка
+    try:
+        with open(path + JOURNAL_SUFFIX, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    days = []
+    for payload, _ in _records(data):
+        day = DAY.unpack_from(payload, 0)[0]
+        (count,) = COUNT16.unpack_from(payload, DAY.size)
+        indices = struct.unpack_from(f'<{count}H', payload, DAY.size + COUNT16.size)
+        days.append((day, [engine._random_events[i]._name for i in indices]))
+    return days
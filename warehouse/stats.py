@@ -0,0 +1,57 @@
+import json
+from time import perf_counter
+
+
+class PhaseStats:
+    def __init__(self):
+        self._phases = {}
+        self._counters = {}
+
+    def start(self):
+        return perf_counter()
+
+    def lap(self, phase, started):
+        now = perf_counter()
+        self.add(phase, now - started)
+        return now
+
+    def add(self, phase, elapsed):
+        entry = self._phases.get(phase)
+        if entry is None:
+            self._phases[phase] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+
+    def count(self, name, amount=1):
+        self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self):
+        self._phases.clear()
+        self._counters.clear()
+
+    def snapshot(self):
+        phases = {}
+        for phase, (calls, total, worst) in self._phases.items():
+            phases[phase] = {
+                'calls': calls,
+                'total_s': total,
+                'mean_us': total / calls * 1e6,
+                'max_us': worst * 1e6,
+            }
+        return {'phases': phases, 'counters': dict(self._counters)}
+
+    def format_lines(self):
+        lines = [f"{'фаза':<24}{'вызовы':>9}{'всего, мс':>12}{'сред., мкс':>12}{'макс., мкс':>12}"]
+        ordered = sorted(self._phases.items(), key=lambda item: item[1][1], reverse=True)
+        for phase, (calls, total, worst) in ordered:
+            lines.append(f"{phase:<24}{calls:>9}{total * 1e3:>12.2f}{total / calls * 1e6:>12.1f}{worst * 1e6:>12.1f}")
+        for name, value in sorted(self._counters.items()):
+            lines.append(f"{name:<24}{value:>9}")
+        return lines
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
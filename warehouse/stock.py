@@ -0,0 +1,313 @@
+from math import exp, fabs, floor, lgamma, log, sqrt
+
+from .engine import WarehouseEngine
+
+
+def binomial(rng, n, p):
+    if n <= 0 or p <= 0.0:
+        return 0
+    if p >= 1.0:
+        return n
+    if hasattr(rng, 'binomialvariate'):
+        return rng.binomialvariate(n, p)
+    if p > 0.5:
+        return n - binomial(rng, n, 1.0 - p)
+    random = rng.random
+    if n * p < 10.0:
+        # геометрический метод (Devroye), O(np)
+        x = y = 0
+        c = log(1.0 - p)
+        while True:
+            y += floor(log(random()) / c) + 1
+            if y > n:
+                return x
+            x += 1
+
+    # BTRS: transformed rejection with squeeze (Hörmann), O(1)
+    spq = sqrt(n * p * (1.0 - p))
+    b = 1.15 + 2.53 * spq
+    a = -0.0873 + 0.0248 * b + 0.01 * p
+    c = n * p + 0.5
+    vr = 0.92 - 4.2 / b
+    alpha = (2.83 + 5.1 / b) * spq
+    lpq = log(p / (1.0 - p))
+    m = floor((n + 1) * p)
+    h = lgamma(m + 1) + lgamma(n - m + 1)
+    while True:
+        u = random() - 0.5
+        us = 0.5 - fabs(u)
+        k = floor((2.0 * a / us + b) * u + c)
+        if k < 0 or k > n:
+            continue
+        v = random()
+        if us >= 0.07 and v <= vr:
+            return k
+        v *= alpha / (a / (us * us) + b)
+        if log(v) <= h - lgamma(k + 1) - lgamma(n - k + 1) + (k - m) * lpq:
+            return k
+
+
+def _log_choose(n, k):
+    return lgamma(n + 1) - lgamma(k + 1) - lgamma(n - k + 1)
+
+def hypergeometric(rng, draws, good, bad):
+    # обращение функции распределения с обходом от моды в обе стороны, O(σ)
+    low = max(0, draws - bad)
+    high = min(draws, good)
+    if low >= high:
+        return low
+    mode = min(high, max(low, (draws + 1) * (good + 1) // (good + bad + 2)))
+    p_mode = exp(_log_choose(good, mode) + _log_choose(bad, draws - mode) - _log_choose(good + bad, draws))
+
+    u = rng.random() - p_mode
+    if u <= 0:
+        return mode
+    down = up = mode
+    p_down = p_up = p_mode
+    while down > low or up < high:
+        if down > low:
+            p_down *= down * (bad - draws + down) / ((good - down + 1) * (draws - down + 1))
+            down -= 1
+            u -= p_down
+            if u <= 0:
+                return down
+        if up < high:
+            p_up *= (good - up) * (draws - up) / ((up + 1) * (bad - draws + up + 1))
+            up += 1
+            u -= p_up
+            if u <= 0:
+                return up
+    return mode
+
+def multivariate_hypergeometric(rng, counts, draws):
+    remaining = sum(counts)
+    taken = []
+    for count in counts:
+        if draws <= 0:
+            taken.append(0)
+            continue
+        remaining -= count
+        k = hypergeometric(rng, draws, count, remaining)
+        taken.append(k)
+        draws -= k
+    return taken
+
+
+class StockLine:
+    __slots__ = ('_name', '_type', '_value', '_healthy', '_damaged_count',
+                 '_humidity_sensitive', '_food', '_row')
+
+    def __init__(self, name, resource_type, value, humidity_sensitive=False, food=False):
+        self._name = name
+        self._type = resource_type
+        self._value = value
+        self._healthy = 0
+        self._damaged_count = 0
+        self._humidity_sensitive = humidity_sensitive
+        self._food = food
+        self._row = 0
+
+    @property
+    def _damaged(self):
+        return self._damaged_count > 0
+
+    def get_info(self):
+        status = "+" if not self._damaged_count else "-"
+        info = f"{status} {self._name} ({self._type}) - {self._value}₽ × {self._healthy} шт."
+        if self._damaged_count:
+            info += f", повреждено: {self._damaged_count}"
+        return info
+
+
+class StockLedger:
+    def __init__(self, quantity=1):
+        self._quantity = quantity
+        self._lines = []
+        self._by_name = {}
+        self._by_type = {}
+        self._type_units = {}
+        self._healthy_units = 0
+        self._damaged_units = 0
+        self._healthy_value = 0.0
+        self._changes = None
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __iter__(self):
+        return iter(self._lines)
+
+    def __getitem__(self, row):
+        return self._lines[row]
+
+    def track_changes(self):
+        if self._changes is None:
+            self._changes = set()
+
+    def pop_changes(self):
+        changes = self._changes
+        if changes is not None:
+            self._changes = set()
+        return changes
+
+    def _changed(self, line):
+        if self._changes is not None:
+            self._changes.add(line._row)
+
+    def add(self, name, resource_type, value, humidity_sensitive=False, food=False, damaged=False, quantity=None):
+        quantity = self._quantity if quantity is None else quantity
+        line = self._by_name.get(name)
+        if line is None:
+            line = StockLine(name, resource_type, value, humidity_sensitive, food)
+            line._row = len(self._lines)
+            self._lines.append(line)
+            self._by_name[name] = line
+            self._by_type.setdefault(resource_type, []).append(line)
+        self._type_units[line._type] = self._type_units.get(line._type, 0) + quantity
+        if damaged:
+            line._damaged_count += quantity
+            self._damaged_units += quantity
+        else:
+            line._healthy += quantity
+            self._healthy_units += quantity
+            self._healthy_value += quantity * line._value
+        self._changed(line)
+        return line
+
+    def damage(self, line, units):
+        line._healthy -= units
+        line._damaged_count += units
+        self._healthy_units -= units
+        self._damaged_units += units
+        self._healthy_value -= units * line._value
+        self._changed(line)
+
+    def repair(self, line, units):
+        line._damaged_count -= units
+        line._healthy += units
+        self._damaged_units -= units
+        self._healthy_units += units
+        self._healthy_value += units * line._value
+        self._changed(line)
+
+    def take(self, line, units):
+        line._healthy -= units
+        self._healthy_units -= units
+        self._healthy_value -= units * line._value
+        self._type_units[line._type] -= units
+        self._changed(line)
+
+    def lines_of_type(self, resource_type):
+        return self._by_type.get(resource_type, ())
+
+    def has_type(self, resource_type):
+        return self._type_units.get(resource_type, 0) > 0
+
+    def count_of_type(self, resource_type):
+        return self._type_units.get(resource_type, 0)
+
+    def damaged_count(self):
+        return self._damaged_units
+
+    def healthy_count(self):
+        return self._healthy_units
+
+    def healthy_value(self):
+        return self._healthy_value
+
+    def healthy_totals(self):
+        totals = {}
+        for line in self._lines:
+            count, value, sensitive_count, sensitive_value = totals.get(line._type, (0, 0.0, 0, 0.0))
+            count += line._healthy
+            value += line._healthy * line._value
+            if line._humidity_sensitive:
+                sensitive_count += line._healthy
+                sensitive_value += line._healthy * line._value
+            totals[line._type] = (count, value, sensitive_count, sensitive_value)
+        return totals
+
+
+class StockWarehouseEngine(WarehouseEngine):
+    # одна строка склада = товар с количеством; каждый источник урона — одна выборка на строку
+    def __init__(self, rng=None, stats=None, catalog=None, seed=None, *, quantity=1):
+        self._quantity = quantity
+        super().__init__(rng, stats, catalog, seed)
+
+    def create_store(self):
+        return StockLedger(self._quantity)
+
+    def damaged_resources(self):
+        return [line for line in self._resources if line._damaged_count]
+
+    def pest_damage(self, pest):
+        damaged = []
+        if not pest._active:
+            return damaged
+        for resource_type in pest._affected_types:
+            for line in self._resources.lines_of_type(resource_type):
+                units = binomial(self._rng, line._healthy, pest._damage_chance)
+                if units:
+                    self._resources.damage(line, units)
+                    damaged.append(f"{line._name} ×{units}")
+        return damaged
+
+    def damage_share(self, chance):
+        for line in self._resources:
+            units = binomial(self._rng, line._healthy, chance)
+            if units:
+                self._resources.damage(line, units)
+
+    def damage_humidity_sensitive(self, chance):
+        for line in self._resources:
+            if line._humidity_sensitive:
+                units = binomial(self._rng, line._healthy, chance)
+                if units:
+                    self._resources.damage(line, units)
+
+    def steal_resources(self, count):
+        ledger = self._resources
+        if not ledger.healthy_count():
+            return []
+
+        lines = list(ledger)
+        taken = multivariate_hypergeometric(self._rng, [line._healthy for line in lines],
+                                            min(count, ledger.healthy_count()))
+        stolen = [(line, units) for line, units in zip(lines, taken) if units]
+        if not self.theft_succeeds():
+            return []
+
+        total_value = sum(line._value * units for line, units in stolen)
+        for line, units in stolen:
+            ledger.take(line, units)
+        stolen = [(line._name, units) for line, units in stolen]
+        self.charge_theft(stolen, total_value)
+        return stolen
+
+    def repair_resources(self, count=None):
+        self.record_action('repair', count)
+        ledger = self._resources
+        damaged = ledger.damaged_count()
+        lines = [line for line in ledger if line._damaged_count]
+        if count is None or count >= damaged:
+            units = [line._damaged_count for line in lines]
+        else:
+            units = multivariate_hypergeometric(self._rng, [line._damaged_count for line in lines], count)
+
+        total = sum(units)
+        cost = self.repair_cost(total)
+        if not total or self._money < cost:
+            return 0
+
+        self._money -= cost
+        for line, k in zip(lines, units):
+            if k:
+                ledger.repair(line, k)
+        return total
+
+
+def make_engine(quantity=None, **kwargs):
+    # quantity — единиц в каждой строке каталога; None — обычный склад, где каждая вещь отдельно
+    if quantity is None:
+        return WarehouseEngine(**kwargs)
+    return StockWarehouseEngine(quantity=quantity, **kwargs)
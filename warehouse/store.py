@@ -0,0 +1,472 @@
+from array import array
+
+from .objects import Resource
+
+DAMAGED = 1
+HUMIDITY_SENSITIVE = 2
+FOOD = 4
+
+OP_DAMAGE = 1
+OP_REPAIR = 2
+OP_REMOVE = 3
+OP_ADD = 4
+
+
+class ResourceView:
+    __slots__ = ('_store', '_slot')
+
+    def __init__(self, store, slot):
+        self._store = store
+        self._slot = slot
+
+    @property
+    def _name(self):
+        store = self._store
+        return store._names[store._name_codes[self._slot]]
+
+    @property
+    def _type(self):
+        store = self._store
+        return store._types[store._type_codes[self._slot]]
+
+    @property
+    def _value(self):
+        value = self._store._values[self._slot]
+        return int(value) if value.is_integer() else value
+
+    @property
+    def _damaged(self):
+        return bool(self._store._flags[self._slot] & DAMAGED)
+
+    @_damaged.setter
+    def _damaged(self, damaged):
+        self._store.set_damaged(self._slot, damaged)
+
+    @property
+    def _humidity_sensitive(self):
+        return bool(self._store._flags[self._slot] & HUMIDITY_SENSITIVE)
+
+    @property
+    def _food(self):
+        return bool(self._store._flags[self._slot] & FOOD)
+
+    def get_info(self):
+        status = "+" if not self._damaged else "-"
+        return f"{status} {self._name} ({self._type}) - {self._value}₽"
+
+    def copy(self):
+        resource = Resource(self._name, self._type, self._value, self._humidity_sensitive, self._food)
+        resource._damaged = self._damaged
+        return resource
+
+
+class _Bucket:
+    # плотное множество слотов: удаление — перестановка с последним элементом
+    __slots__ = ('_members',)
+
+    def __init__(self):
+        self._members = array('I')
+
+    def __len__(self):
+        return len(self._members)
+
+    def add(self, slot, positions):
+        positions[slot] = len(self._members)
+        self._members.append(slot)
+
+    def discard(self, slot, positions):
+        members = self._members
+        i = positions[slot]
+        last = members.pop()
+        if last != slot:
+            members[i] = last
+            positions[last] = i
+
+    def replace(self, old, new, positions):
+        i = positions[old]
+        self._members[i] = new
+        positions[new] = i
+
+    def restore(self, slot, i, positions):
+        # обратное к discard: slot возвращается на место i, занявший его элемент — в конец
+        members = self._members
+        if i == len(members):
+            members.append(slot)
+        else:
+            moved = members[i]
+            positions[moved] = len(members)
+            members.append(moved)
+            members[i] = slot
+        positions[slot] = i
+
+
+class ResourceStore:
+    def __init__(self):
+        self._names = []
+        self._name_lookup = {}
+        self._types = []
+        self._type_lookup = {}
+
+        self._name_codes = array('I')
+        self._type_codes = array('H')
+        self._values = array('d')
+        self._flags = bytearray()
+        self._health_positions = array('I')
+        self._humidity_positions = array('I')
+
+        self._healthy = []
+        self._type_counts = array('q')
+        self._damaged = _Bucket()
+        self._humidity = _Bucket()
+        self._healthy_value = 0.0
+        self._total_value = 0.0
+        self._changes = None
+        self._journal = None
+        self._undo = None
+        self._totals = None
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return (ResourceView(self, slot) for slot in range(len(self._values)))
+
+    def __getitem__(self, slot):
+        if not 0 <= slot < len(self._values):
+            raise IndexError(slot)
+        return ResourceView(self, slot)
+
+    def track_changes(self):
+        if self._changes is None:
+            self._changes = set()
+
+    def pop_changes(self):
+        # None — изменения не отслеживались, нужно перерисовать всё
+        changes = self._changes
+        if changes is not None:
+            self._changes = set()
+        return changes
+
+    def track_journal(self):
+        if self._journal is None:
+            self._journal = []
+
+    def pop_journal(self):
+        # операции в порядке выполнения: (OP_*, слот[, имя, тип, стоимость, флаги])
+        journal = self._journal
+        if journal is not None:
+            self._journal = []
+        return journal
+
+    def track_undo(self):
+        if self._undo is None:
+            self._undo = []
+
+    def pop_undo(self):
+        # записи с данными для точной отмены; порядок корзин восстанавливается тоже
+        undo = self._undo
+        if undo is not None:
+            self._undo = []
+        return undo
+
+    def _tally(self, slot, sign):
+        # здоровые суммы по типам ведутся только после первого healthy_totals()
+        totals = self._totals
+        if totals is None:
+            return
+        values, sensitive_counts, sensitive_values = totals
+        code = self._type_codes[slot]
+        value = self._values[slot]
+        values[code] += sign * value
+        if self._flags[slot] & HUMIDITY_SENSITIVE:
+            sensitive_counts[code] += sign
+            sensitive_values[code] += sign * value
+
+    def rollback(self, undo):
+        for entry in reversed(undo):
+            op, slot = entry[0], entry[1]
+            if op == OP_DAMAGE or op == OP_REPAIR:
+                self._unset_damaged(slot, entry[2], op == OP_DAMAGE)
+            elif op == OP_REMOVE:
+                self._unremove(*entry[1:])
+            else:
+                self._unadd(slot, entry[6], entry[7])
+            if self._changes is not None:
+                self._changes.add(slot)
+
+    def redo(self, undo):
+        for entry in undo:
+            op, slot = entry[0], entry[1]
+            if op == OP_DAMAGE or op == OP_REPAIR:
+                self.set_damaged(slot, op == OP_DAMAGE)
+            elif op == OP_REMOVE:
+                self.remove_slot(slot)
+            else:
+                flags = entry[5]
+                self.add(entry[2], entry[3], entry[4], bool(flags & HUMIDITY_SENSITIVE),
+                         bool(flags & FOOD), bool(flags & DAMAGED))
+
+    def _unset_damaged(self, slot, position, damaged):
+        healthy = self._healthy[self._type_codes[slot]]
+        if damaged:
+            self._damaged._members.pop()
+            healthy.restore(slot, position, self._health_positions)
+            self._flags[slot] &= ~DAMAGED
+            self._healthy_value += self._values[slot]
+            self._tally(slot, 1)
+        else:
+            healthy._members.pop()
+            self._damaged.restore(slot, position, self._health_positions)
+            self._flags[slot] |= DAMAGED
+            self._healthy_value -= self._values[slot]
+            self._tally(slot, -1)
+
+    def _unremove(self, slot, name_code, type_code, value, flags, health_position, humidity_position):
+        last = len(self._values)
+        self._health_positions.append(0)
+        self._humidity_positions.append(0)
+        if slot == last:
+            self._name_codes.append(name_code)
+            self._type_codes.append(type_code)
+            self._values.append(value)
+            self._flags.append(flags)
+        else:
+            # переехавший в slot элемент возвращается на последнее место
+            moved_flags = self._flags[slot]
+            if moved_flags & DAMAGED:
+                self._damaged.replace(slot, last, self._health_positions)
+            else:
+                self._healthy[self._type_codes[slot]].replace(slot, last, self._health_positions)
+            if moved_flags & HUMIDITY_SENSITIVE:
+                self._humidity.replace(slot, last, self._humidity_positions)
+            self._name_codes.append(self._name_codes[slot])
+            self._type_codes.append(self._type_codes[slot])
+            self._values.append(self._values[slot])
+            self._flags.append(moved_flags)
+            self._name_codes[slot] = name_code
+            self._type_codes[slot] = type_code
+            self._values[slot] = value
+            self._flags[slot] = flags
+            if self._changes is not None:
+                self._changes.add(last)
+
+        if flags & DAMAGED:
+            self._damaged.restore(slot, health_position, self._health_positions)
+        else:
+            self._healthy[type_code].restore(slot, health_position, self._health_positions)
+            self._healthy_value += value
+            self._tally(slot, 1)
+        if flags & HUMIDITY_SENSITIVE:
+            self._humidity.restore(slot, humidity_position, self._humidity_positions)
+        self._type_counts[type_code] += 1
+        self._total_value += value
+
+    def _unadd(self, slot, new_name, new_type):
+        # добавленный элемент последний и в колонках, и в своих корзинах
+        if not self._flags[-1] & DAMAGED:
+            self._tally(len(self._flags) - 1, -1)
+        flags = self._flags.pop()
+        type_code = self._type_codes.pop()
+        value = self._values.pop()
+        self._name_codes.pop()
+        self._health_positions.pop()
+        self._humidity_positions.pop()
+        if flags & DAMAGED:
+            self._damaged._members.pop()
+        else:
+            self._healthy[type_code]._members.pop()
+            self._healthy_value -= value
+        if flags & HUMIDITY_SENSITIVE:
+            self._humidity._members.pop()
+        self._type_counts[type_code] -= 1
+        self._total_value -= value
+        if new_type:
+            del self._type_lookup[self._types.pop()]
+            self._healthy.pop()
+            self._type_counts.pop()
+            if self._totals is not None:
+                for column in self._totals:
+                    column.pop()
+        if new_name:
+            del self._name_lookup[self._names.pop()]
+
+    def _intern_type(self, resource_type):
+        code = self._type_lookup.get(resource_type)
+        if code is None:
+            code = len(self._types)
+            self._types.append(resource_type)
+            self._type_lookup[resource_type] = code
+            self._healthy.append(_Bucket())
+            self._type_counts.append(0)
+            if self._totals is not None:
+                for column in self._totals:
+                    column.append(0)
+        return code
+
+    def _intern_name(self, name):
+        code = self._name_lookup.get(name)
+        if code is None:
+            code = len(self._names)
+            self._names.append(name)
+            self._name_lookup[name] = code
+        return code
+
+    def add(self, name, resource_type, value, humidity_sensitive=False, food=False, damaged=False):
+        slot = len(self._values)
+        new_name = name not in self._name_lookup
+        new_type = resource_type not in self._type_lookup
+        type_code = self._intern_type(resource_type)
+        flags = (DAMAGED if damaged else 0) | (HUMIDITY_SENSITIVE if humidity_sensitive else 0) | (FOOD if food else 0)
+
+        self._name_codes.append(self._intern_name(name))
+        self._type_codes.append(type_code)
+        self._values.append(value)
+        self._flags.append(flags)
+        self._health_positions.append(0)
+        self._humidity_positions.append(0)
+
+        self._type_counts[type_code] += 1
+        self._total_value += value
+        if damaged:
+            self._damaged.add(slot, self._health_positions)
+        else:
+            self._healthy[type_code].add(slot, self._health_positions)
+            self._healthy_value += value
+            self._tally(slot, 1)
+        if humidity_sensitive:
+            self._humidity.add(slot, self._humidity_positions)
+        if self._changes is not None:
+            self._changes.add(slot)
+        if self._journal is not None:
+            self._journal.append((OP_ADD, slot, name, resource_type, value, flags))
+        if self._undo is not None:
+            self._undo.append((OP_ADD, slot, name, resource_type, value, flags, new_name, new_type))
+        return slot
+
+    def append(self, resource):
+        return self.add(resource._name, resource._type, resource._value,
+                        resource._humidity_sensitive, resource._food, resource._damaged)
+
+    def set_damaged(self, slot, damaged):
+        flags = self._flags[slot]
+        if bool(flags & DAMAGED) == bool(damaged):
+            return
+        healthy = self._healthy[self._type_codes[slot]]
+        if self._undo is not None:
+            self._undo.append((OP_DAMAGE if damaged else OP_REPAIR, slot, self._health_positions[slot]))
+        if damaged:
+            healthy.discard(slot, self._health_positions)
+            self._damaged.add(slot, self._health_positions)
+            self._flags[slot] = flags | DAMAGED
+            self._healthy_value -= self._values[slot]
+            self._tally(slot, -1)
+        else:
+            self._damaged.discard(slot, self._health_positions)
+            healthy.add(slot, self._health_positions)
+            self._flags[slot] = flags & ~DAMAGED
+            self._healthy_value += self._values[slot]
+            self._tally(slot, 1)
+        if self._changes is not None:
+            self._changes.add(slot)
+        if self._journal is not None:
+            self._journal.append((OP_DAMAGE if damaged else OP_REPAIR, slot))
+
+    def remove(self, resource):
+        self.remove_slot(resource._slot)
+
+    def remove_slot(self, slot):
+        flags = self._flags[slot]
+        type_code = self._type_codes[slot]
+        value = self._values[slot]
+        if self._undo is not None:
+            self._undo.append((OP_REMOVE, slot, self._name_codes[slot], type_code, value, flags,
+                               self._health_positions[slot], self._humidity_positions[slot]))
+
+        if flags & DAMAGED:
+            self._damaged.discard(slot, self._health_positions)
+        else:
+            self._healthy[type_code].discard(slot, self._health_positions)
+            self._healthy_value -= value
+            self._tally(slot, -1)
+        if flags & HUMIDITY_SENSITIVE:
+            self._humidity.discard(slot, self._humidity_positions)
+        self._type_counts[type_code] -= 1
+        self._total_value -= value
+
+        last = len(self._values) - 1
+        if self._changes is not None:
+            self._changes.add(slot)
+            self._changes.discard(last)
+        if self._journal is not None:
+            self._journal.append((OP_REMOVE, slot))
+        if slot != last:
+            # последний элемент переезжает в освободившийся слот
+            last_flags = self._flags[last]
+            if last_flags & DAMAGED:
+                self._damaged.replace(last, slot, self._health_positions)
+            else:
+                self._healthy[self._type_codes[last]].replace(last, slot, self._health_positions)
+            if last_flags & HUMIDITY_SENSITIVE:
+                self._humidity.replace(last, slot, self._humidity_positions)
+            self._name_codes[slot] = self._name_codes[last]
+            self._type_codes[slot] = self._type_codes[last]
+            self._values[slot] = self._values[last]
+            self._flags[slot] = last_flags
+
+        for column in (self._name_codes, self._type_codes, self._values,
+                       self._health_positions, self._humidity_positions):
+            column.pop()
+        self._flags.pop()
+
+    def remove_slots(self, slots):
+        # по убыванию: переезжающий последний элемент никогда не входит в оставшиеся слоты
+        for slot in sorted(slots, reverse=True):
+            self.remove_slot(slot)
+
+    def has_type(self, resource_type):
+        code = self._type_lookup.get(resource_type)
+        return code is not None and self._type_counts[code] > 0
+
+    def count_of_type(self, resource_type):
+        code = self._type_lookup.get(resource_type)
+        return 0 if code is None else self._type_counts[code]
+
+    def healthy_slots_of_type(self, resource_type):
+        code = self._type_lookup.get(resource_type)
+        return [] if code is None else self._healthy[code]._members.tolist()
+
+    def healthy_slots(self):
+        return [slot for bucket in self._healthy for slot in bucket._members]
+
+    def damaged_slots(self):
+        return self._damaged._members.tolist()
+
+    def humidity_sensitive_slots(self):
+        return self._humidity._members.tolist()
+
+    def views(self, slots):
+        return [ResourceView(self, slot) for slot in slots]
+
+    def damaged_count(self):
+        return len(self._damaged)
+
+    def healthy_count(self):
+        return len(self._values) - len(self._damaged)
+
+    def healthy_value(self):
+        return self._healthy_value
+
+    def total_value(self):
+        return self._total_value
+
+    def healthy_totals(self):
+        # {тип: (здоровых, их стоимость, из них чувствительных к влажности, их стоимость)}
+        if self._totals is None:
+            size = len(self._types)
+            self._totals = (array('d', [0.0]) * size, array('q', [0]) * size, array('d', [0.0]) * size)
+            for bucket in self._healthy:
+                for slot in bucket._members:
+                    self._tally(slot, 1)
+        values, sensitive_counts, sensitive_values = self._totals
+        return {resource_type: (len(self._healthy[code]), values[code], sensitive_counts[code], sensitive_values[code])
+                for code, resource_type in enumerate(self._types)}
@@ -0,0 +1,157 @@
+import argparse
+import csv
+import json
+import sys
+from array import array
+from time import perf_counter
+
+from .montecarlo import Policy
+from .stock import make_engine
+
+BUFFER_ROWS = 65536
+FLUSH_ROWS = 4096
+BASE_FIELDS = ('day', 'money', 'rent', 'humidity', 'active_pests', 'events', 'poisons_used', 'stolen')
+DAMAGED_PREFIX = 'damaged:'
+
+
+def fields_of(engine):
+    # набор колонок фиксируется по каталогу, чтобы у всех строк он был одинаковым
+    types = sorted({record[1] for record in engine._catalog.resource_records()})
+    return BASE_FIELDS + tuple(DAMAGED_PREFIX + t for t in types)
+
+def day_records(engine, days, policy=None):
+    # по кортежу на день в порядке fields_of(engine); история нигде не копится
+    policy = policy or Policy()
+    types = [name[len(DAMAGED_PREFIX):] for name in fields_of(engine)[len(BASE_FIELDS):]]
+    store = engine._resources
+    next_day = engine.next_day
+    for _ in range(days):
+        used = engine._poisons_used
+        policy.act(engine)
+        result = next_day()
+        totals = store.healthy_totals()
+        damaged = tuple(store.count_of_type(t) - totals.get(t, (0,))[0] for t in types)
+        yield (engine._day, engine._money, result._rent, engine._humidity,
+               sum(1 for p in engine._pests if p._active),
+               ';'.join(e._name for e in result._events),
+               engine._poisons_used - used,
+               sum(count for _, count in result._stolen)) + damaged
+
+
+class FileSink:
+    def __init__(self, path, flush_rows=FLUSH_ROWS, newline=None):
+        self._file = open(path, 'w', encoding='utf-8', newline=newline)
+        self._flush_rows = flush_rows
+        self._rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def written(self):
+        # сброс на диск раз в flush_rows строк, а не на каждой
+        self._rows += 1
+        if self._rows % self._flush_rows == 0:
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class CsvSink(FileSink):
+    def __init__(self, path, fields, flush_rows=FLUSH_ROWS):
+        super().__init__(path, flush_rows, newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(fields)
+
+    def write(self, record):
+        self._writer.writerow(record)
+        self.written()
+
+class JsonlSink(FileSink):
+    def __init__(self, path, fields, flush_rows=FLUSH_ROWS):
+        super().__init__(path, flush_rows)
+        self._fields = fields
+
+    def write(self, record):
+        self._file.write(json.dumps(dict(zip(self._fields, record)), ensure_ascii=False))
+        self._file.write('\n')
+        self.written()
+
+class ColumnBuffer:
+    # колонки в array; при заполнении отдаются в flush(columns, rows) и буфер начинается заново
+    def __init__(self, fields, flush, capacity=BUFFER_ROWS):
+        self._fields = fields
+        self._flush = flush
+        self._capacity = capacity
+        self._columns = {}
+        self._rows = 0
+        self.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._rows
+
+    def clear(self):
+        self._rows = 0
+        for name in self._fields:
+            if name == 'events':
+                self._columns[name] = []
+            elif name in ('money', 'rent'):
+                self._columns[name] = array('d')
+            else:
+                self._columns[name] = array('q')
+
+    def write(self, record):
+        for column, value in zip(self._columns.values(), record):
+            column.append(value)
+        self._rows += 1
+        if self._rows >= self._capacity:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            self._flush(self._columns, self._rows)
+            self.clear()
+
+    def close(self):
+        self.flush()
+
+
+def export(records, sink):
+    count = 0
+    with sink:
+        for record in records:
+            sink.write(record)
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Поток показателей по дням для долгих прогонов без интерфейса")
+    parser.add_argument('output', help="файл .csv или .jsonl")
+    parser.add_argument('--days', type=int, default=100000)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--quantity', type=int,
+                        help="единиц в каждой строке склада (StockWarehouseEngine); по умолчанию — поштучный склад")
+    args = parser.parse_args(argv)
+    if args.quantity is not None and args.quantity < 1:
+        parser.error("--quantity должно быть не меньше 1")
+
+    engine = make_engine(args.quantity, seed=args.seed)
+    fields = fields_of(engine)
+    sink = JsonlSink(args.output, fields) if args.output.endswith('.jsonl') else CsvSink(args.output, fields)
+    started = perf_counter()
+    count = export(day_records(engine, args.days), sink)
+    print(f"{count} дней за {perf_counter() - started:.2f} с: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
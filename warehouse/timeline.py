@@ -0,0 +1,143 @@
+from array import array
+
+from .store import ResourceStore
+
+
+class TimelineNode:
+    def __init__(self, index, parent, label, undo, state, actions_start, actions, actions_length):
+        self._index = index
+        self._parent = parent
+        self._label = label
+        # операции склада от родителя до этого узла (с данными для отмены)
+        self._undo = undo
+        self._state = state
+        self._actions_start = actions_start
+        self._actions = actions
+        self._actions_length = actions_length
+        self._children = []
+
+    def get_info(self):
+        day, money = self._state[0], self._state[1]
+        return f"#{self._index} {self._label} — день {day}, {money:.0f}₽"
+
+
+class Timeline:
+    # дерево состояний одной партии: ветка стоит O(изменений), а не O(склада)
+    def __init__(self, engine):
+        if not isinstance(engine._resources, ResourceStore):
+            raise TypeError("ветвление поддерживает только склад на ResourceStore")
+        self._engine = engine
+        self._nodes = []
+        engine._resources.pop_undo()
+        engine._resources.track_undo()
+        self._current = self._new_node(None, "Начало", [])
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __getitem__(self, index):
+        return self._nodes[index]
+
+    def _capture(self):
+        engine = self._engine
+        store = engine._resources
+        rng_state = None
+        if hasattr(engine._rng, 'getstate'):
+            version, internal, gauss = engine._rng.getstate()
+            rng_state = (version, array('I', internal).tobytes(), gauss)
+        return (engine._day, engine._money, engine._humidity, engine._security_level,
+                bytes(1 if p._active else 0 for p in engine._pests),
+                tuple(p._owned for p in engine._poisons),
+                store._healthy_value, store._total_value, rng_state)
+
+    def _restore(self, state):
+        engine = self._engine
+        store = engine._resources
+        (engine._day, engine._money, engine._humidity, engine._security_level,
+         pests, poisons, store._healthy_value, store._total_value, rng_state) = state
+        for pest, active in zip(engine._pests, pests):
+            pest._active = bool(active)
+        for poison, owned in zip(engine._poisons, poisons):
+            poison._owned = owned
+        if rng_state is not None:
+            version, internal, gauss = rng_state
+            engine._rng.setstate((version, tuple(array('I', internal)), gauss))
+
+    def _new_node(self, parent, label, undo):
+        actions = self._engine._actions
+        start = 0
+        copied = []
+        if actions is not None:
+            # последняя запись родителя могла дорасти (['next_day', n]), поэтому берём и её
+            start = max(0, parent._actions_length - 1) if parent is not None else 0
+            copied = [list(action) for action in actions[start:]]
+        node = TimelineNode(len(self._nodes), parent, label, undo, self._capture(), start, copied,
+                            len(actions) if actions is not None else 0)
+        self._nodes.append(node)
+        if parent is not None:
+            parent._children.append(node)
+        return node
+
+    def current(self):
+        return self._current
+
+    def pending(self):
+        node = self._current
+        actions = self._engine._actions
+        if actions is not None and (len(actions) != node._actions_length
+                                    or (actions and actions[-1] != node._actions[-1])):
+            return True
+        return bool(self._engine._resources._undo) or self._capture() != node._state
+
+    def commit(self, label):
+        node = self._new_node(self._current, label, self._engine._resources.pop_undo())
+        self._current = node
+        return node
+
+    def undo(self):
+        parent = self._current._parent
+        if parent is None:
+            return None
+        return self.checkout(parent)
+
+    def checkout(self, node):
+        if self.pending():
+            self.commit("Без названия")
+        store = self._engine._resources
+
+        ancestors = set()
+        target = node
+        while target is not None:
+            ancestors.add(target._index)
+            target = target._parent
+        current = self._current
+        while current._index not in ancestors:
+            store.rollback(current._undo)
+            current = current._parent
+
+        path = []
+        target = node
+        while target is not current:
+            path.append(target)
+            target = target._parent
+        for target in reversed(path):
+            store.redo(target._undo)
+            store.pop_undo()
+
+        self._restore(node._state)
+        self._restore_actions(node)
+        self._current = node
+        return node
+
+    def _restore_actions(self, node):
+        if self._engine._actions is None:
+            return
+        path = []
+        while node is not None:
+            path.append(node)
+            node = node._parent
+        actions = []
+        for node in reversed(path):
+            del actions[node._actions_start:]
+            actions.extend(list(action) for action in node._actions)
+        self._engine._actions = actions
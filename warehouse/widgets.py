@@ -0,0 +1,107 @@
+import tkinter as tk
+
+
+class VirtualListbox(tk.Frame):
+    # в Listbox лежат только видимые строки; текст строки запрашивается через row_text(i)
+    def __init__(self, master, height, row_count, row_text, bg='#B1E0F2', **listbox_options):
+        super().__init__(master, bg=bg)
+        self._height = height
+        self._row_count = row_count
+        self._row_text = row_text
+        self._first = 0
+        self._total = 0
+        self._shown = []
+
+        self._listbox = tk.Listbox(self, height=height, **listbox_options)
+        self._listbox.pack(side='left', fill='both', expand=True)
+        self._scrollbar = tk.Scrollbar(self, orient='vertical', command=self._on_scroll)
+        self._scrollbar.pack(side='right', fill='y')
+
+        self._listbox.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self._listbox.bind('<Button-4>', lambda e: self.scroll(-1))
+        self._listbox.bind('<Button-5>', lambda e: self.scroll(1))
+
+    def refresh(self, changed=None):
+        total = self._row_count()
+        first = max(0, min(self._first, total - self._height))
+        visible = min(self._height, total - first)
+
+        if changed is None or first != self._first or total != self._total:
+            rows = range(visible)
+        else:
+            rows = [row - first for row in changed if first <= row < first + visible]
+        self._first = first
+        self._total = total
+
+        for i in rows:
+            self._set_row(i, self._row_text(first + i))
+        while len(self._shown) > visible:
+            self._shown.pop()
+            self._listbox.delete(len(self._shown))
+
+        if total:
+            self._scrollbar.set(first / total, (first + visible) / total)
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+    def _set_row(self, i, text):
+        if i < len(self._shown):
+            if self._shown[i] == text:
+                return
+            self._listbox.delete(i)
+            self._listbox.insert(i, text)
+            self._shown[i] = text
+        else:
+            self._listbox.insert(tk.END, text)
+            self._shown.append(text)
+
+    def selected(self):
+        # номер выбранной строки во всём списке, а не среди видимых
+        selection = self._listbox.curselection()
+        return self._first + selection[0] if selection else None
+
+    def scroll(self, rows):
+        self.scroll_to(self._first + rows)
+
+    def scroll_to(self, first):
+        self._first = max(0, first)
+        self.refresh()
+
+    def _on_scroll(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * self._total))
+        elif unit == 'pages':
+            self.scroll(int(amount) * self._height)
+        else:
+            self.scroll(int(amount))
+
+
+class EventLog(tk.Frame):
+    # немодальная лента сообщений; записи копятся и выводятся одним вызовом flush()
+    def __init__(self, master, height=8, max_lines=2000, bg='#B1E0F2', **text_options):
+        super().__init__(master, bg=bg)
+        self._max_lines = max_lines
+        self._pending = []
+
+        self._text = tk.Text(self, height=height, state='disabled', wrap='word', **text_options)
+        self._text.pack(side='left', fill='both', expand=True)
+        self._scrollbar = tk.Scrollbar(self, orient='vertical', command=self._text.yview)
+        self._scrollbar.pack(side='right', fill='y')
+        self._text.configure(yscrollcommand=self._scrollbar.set)
+
+    def append(self, title, text):
+        self._pending.append(f"[{title}] {text}\n")
+
+    def flush(self):
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending = []
+
+        self._text.configure(state='normal')
+        self._text.insert(tk.END, text)
+        lines = int(self._text.index('end-1c').split('.')[0])
+        if lines > self._max_lines:
+            self._text.delete('1.0', f"{lines - self._max_lines + 1}.0")
+        self._text.configure(state='disabled')
+        self._text.see(tk.END)